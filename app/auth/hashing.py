@@ -0,0 +1,61 @@
+"""Password hashing and verification offloaded to a bounded process pool."""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Union
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from app.config import settings
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+_executor: Union[ProcessPoolExecutor, None] = None
+_pending = 0
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify_and_update(password: str, hashed_password: str):
+    return pwd_context.verify_and_update(password, hashed_password)
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Create the worker pool on first use so each server process owns its own."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+async def _run(func, *args):
+    """Run a password operation in the pool, rejecting it if the queue is full."""
+    global _pending
+    if _pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many pending password operations",
+            headers={"Retry-After": "1"},
+        )
+
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), func, *args)
+    finally:
+        _pending -= 1
+
+async def hash_password(password: str) -> str:
+    """Hash a password with the current default scheme."""
+    return await _run(_hash, password)
+
+async def verify_password(password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """Verify a password, also returning a new hash if the stored one is outdated."""
+    return await _run(_verify_and_update, password, hashed_password)
+
+def shutdown_executor():
+    """Stop the worker pool, waiting for in-flight operations to finish."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
@@ -1,8 +1,8 @@
 """Auth routes module"""
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.auth import schemas, services, utils
+from app.auth import schemas, services, throttling, utils
 from app.database import get_db
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
@@ -10,9 +10,14 @@ router = APIRouter(prefix="/api/auth", tags=["auth"])
 @router.post("/login", response_model=utils.Token)
 async def login(
     user: schemas.UserLogin,
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
     """Login a user"""
+    # The session connects lazily, so throttled attempts never reach the database
+    client_ip = request.client.host if request.client else "unknown"
+    await throttling.login_throttle.check(client_ip, user.username)
+
     if not await services.authenticate_user(user.username, user.password, db):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
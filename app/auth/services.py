@@ -1,15 +1,26 @@
 """This module contains the business logic for the auth service"""
 
-from passlib.context import CryptContext
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache import TTLCache
+from app.config import settings
+from .hashing import hash_password, verify_password
 from .models import User
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Users resolved from access tokens, keyed by username (the token subject)
+principal_cache = TTLCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    name="principal",
+)
+
+def invalidate_principal(username: str):
+    """Drop a cached user so the next request reloads it from the database"""
+    principal_cache.pop(username)
 
 async def create_user(username: str, password: str, db: AsyncSession):
     """Create a new user"""
-    hashed_password = pwd_context.hash(password)
+    hashed_password = await hash_password(password)
     user = User(username=username, hashed_password=hashed_password)
     db.add(user)
     await db.commit()
@@ -23,8 +34,15 @@ async def authenticate_user(username: str, password: str, db: AsyncSession):
 
     if not user:
         return False
-    if not pwd_context.verify(password, user.hashed_password):
+    is_valid, new_hash = await verify_password(password, user.hashed_password)
+    if not is_valid:
         return False
+
+    # Upgrade hashes made with outdated schemes or settings while we have the password
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+        invalidate_principal(username)
     return user
 
 async def get_user_by_username(username: str, db: AsyncSession):
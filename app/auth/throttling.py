@@ -0,0 +1,70 @@
+"""Token-bucket throttling of login attempts, per client IP and per username."""
+import math
+import time
+from collections import OrderedDict
+from typing import Protocol
+from fastapi import HTTPException
+from app.config import settings
+
+class BucketStore(Protocol):
+    """Storage for token buckets; swap in a shared implementation to throttle across processes."""
+
+    async def take(self, key: str, capacity: float, per_second: float) -> float:
+        """Take a token from a bucket, returning 0 on success or the seconds until one refills."""
+        ...
+
+class MemoryBucketStore:
+    """Buckets kept in this process, evicting the least recently used over `max_size`.
+
+    An evicted bucket comes back full, which is the same as one left idle
+    long enough to refill, so eviction only ever errs towards allowing.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._buckets: OrderedDict = OrderedDict()
+
+    async def take(self, key: str, capacity: float, per_second: float) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * per_second)
+
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / per_second
+
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_size:
+            self._buckets.popitem(last=False)
+        return wait
+
+class LoginThrottle:
+    """Rejects login attempts over the per-IP or per-username rate before any work is done."""
+
+    def __init__(self, store: BucketStore):
+        self.store = store
+
+    async def check(self, client_ip: str, username: str):
+        """Raise a 429 with Retry-After if either bucket is empty."""
+        wait = await self.store.take(
+            f"ip:{client_ip}",
+            settings.LOGIN_THROTTLE_IP_BURST,
+            settings.LOGIN_THROTTLE_IP_PER_MINUTE / 60,
+        )
+        if not wait:
+            # Case variants of a username share a bucket so they can't be used to dodge it
+            wait = await self.store.take(
+                f"user:{username.casefold()}",
+                settings.LOGIN_THROTTLE_USERNAME_BURST,
+                settings.LOGIN_THROTTLE_USERNAME_PER_MINUTE / 60,
+            )
+        if wait:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many login attempts",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+login_throttle = LoginThrottle(MemoryBucketStore(max_size=settings.LOGIN_THROTTLE_MAX_BUCKETS))
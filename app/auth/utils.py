@@ -5,9 +5,8 @@ from pydantic import BaseModel
 from jose import JWTError, jwt
 from fastapi import HTTPException, Depends
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.ext.asyncio import AsyncSession
 from .services import get_user_by_username
-from app.database import get_db
+from app.database import read_session
 from app.auth import services
 from app.config import settings
 
@@ -42,8 +41,12 @@ def verify_token(token: str):
     except JWTError:
         return False
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
-    """Get the currently authenticated user from the token."""
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    """Get the currently authenticated user from the token.
+
+    The user is looked up in a session of its own rather than a request-scoped
+    one, so long-lived routes such as streams don't hold a pooled connection.
+    """
     credentials_exception = HTTPException(
         status_code=401,
         detail="Could not validate credentials",
@@ -52,7 +55,11 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     token_data = verify_token(token)
     if not token_data:
         raise credentials_exception
-    user = await services.get_user_by_username(token_data.username, db)
-    if not user:
-        raise credentials_exception
+    user = services.principal_cache.get(token_data.username)
+    if user is None:
+        async with read_session() as db:
+            user = await services.get_user_by_username(token_data.username, db)
+        if not user:
+            raise credentials_exception
+        services.principal_cache.set(token_data.username, user)
     return user
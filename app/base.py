@@ -1,3 +1,5 @@
 from app.employees.models import *
 from app.auth.models import *
+from app.jobs.models import *
+from app.idempotency.models import *
 from app.database import Base
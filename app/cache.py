@@ -0,0 +1,59 @@
+"""In-process cache with LRU eviction and per-entry expiry"""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+from app.metrics import CACHE_REQUESTS
+
+class TTLCache:
+    """A bounded mapping whose entries expire after a time-to-live.
+
+    Once `max_size` entries are stored, the least recently used one is
+    evicted. Hits and misses are counted, and a named cache also exports
+    them as the `cache_requests_total` Prometheus counter.
+    """
+
+    def __init__(self, max_size: int, ttl: float, name: Optional[str] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._hit_counter = CACHE_REQUESTS.labels(name, "hit") if name else None
+        self._miss_counter = CACHE_REQUESTS.labels(name, "miss") if name else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the live value for a key, or `default` if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            if self._miss_counter:
+                self._miss_counter.inc()
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        if self._hit_counter:
+            self._hit_counter.inc()
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting the least recently used entries over capacity."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a key, returning its value whether or not it has expired."""
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self):
+        """Remove every entry."""
+        self._entries.clear()
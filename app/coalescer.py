@@ -0,0 +1,66 @@
+"""Micro-batching of concurrent calls into one flush per time window"""
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+class Coalescer:
+    """Groups items submitted under the same key into batches handed to `flush`.
+
+    A batch is flushed `window` seconds after its first item arrives, or as
+    soon as it holds `max_batch` items. `flush(key, items)` returns one result
+    per item, in order; a result that is an exception is raised to the caller
+    that submitted that item, and an exception raised by `flush` itself is
+    raised to every caller in the batch.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[Hashable, list], Awaitable[list]],
+        window: float,
+        max_batch: int,
+    ):
+        self.flush = flush
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: dict[Hashable, list] = {}
+        self._timers: dict[Hashable, asyncio.TimerHandle] = {}
+        self._flushes: set[asyncio.Task] = set()
+
+    async def submit(self, key: Hashable, item: Any) -> Any:
+        """Add an item to the open batch for `key` and wait for its own result."""
+        future = asyncio.get_running_loop().create_future()
+        batch = self._pending.setdefault(key, [])
+        batch.append((item, future))
+
+        if len(batch) >= self.max_batch:
+            self._start_flush(key)
+        elif len(batch) == 1:
+            self._timers[key] = asyncio.get_running_loop().call_later(
+                self.window, self._start_flush, key
+            )
+        return await future
+
+    def _start_flush(self, key: Hashable):
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if batch:
+            # Keep a reference so the task isn't garbage collected mid-flush
+            task = asyncio.create_task(self._flush(key, batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, key: Hashable, batch: list):
+        try:
+            results = await self.flush(key, [item for item, _ in batch])
+        except Exception as exc:
+            results = [exc] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                # The caller went away; its item was still written
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
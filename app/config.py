@@ -1,11 +1,68 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    DATABASE_REPLICA_URLS: str = ""
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+    QUERY_LOG_SAMPLE_RATE: float = 0.0
+    QUERY_LOG_EXPLAIN: bool = False
+    REPEATED_QUERY_THRESHOLD: int = 3
+    REPLICA_FAILURE_COOLDOWN_SECONDS: float = 30
+    REPLICA_HEALTH_CHECK_SECONDS: float = 5
+    READ_YOUR_WRITES_SECONDS: float = 5
     SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 1024
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    LOGIN_THROTTLE_IP_BURST: int = 20
+    LOGIN_THROTTLE_IP_PER_MINUTE: float = 20
+    LOGIN_THROTTLE_USERNAME_BURST: int = 5
+    LOGIN_THROTTLE_USERNAME_PER_MINUTE: float = 5
+    LOGIN_THROTTLE_MAX_BUCKETS: int = 10000
+    EMPLOYEE_PAGE_SIZE: int = 50
+    EMPLOYEE_MAX_PAGE_SIZE: int = 200
+    EMPLOYEE_SEARCH_LIMIT: int = 10
+    EMPLOYEE_SEARCH_MAX_LIMIT: int = 50
+    EMPLOYEE_LIST_CACHE_MAX_SIZE: int = 256
+    EMPLOYEE_LIST_CACHE_TTL_SECONDS: float = 30
+    EMPLOYEE_EXPORT_CHUNK_SIZE: int = 1000
+    EMPLOYEE_BULK_MAX_ITEMS: int = 1000
+    EMPLOYEE_CREATE_COALESCE_WINDOW_MS: float = 0  # 0 disables coalescing of creates
+    EMPLOYEE_CREATE_COALESCE_MAX_BATCH: int = 100
+    EMPLOYEE_IMPORT_CHUNK_SIZE: int = 5000
+    EMPLOYEE_IMPORT_MAX_REPORTED_ERRORS: int = 100
+    EMPLOYEE_STATS_RECONCILE_SECONDS: int = 300
+    CHANGE_FEED_BROKER: str = "memory"  # "memory" or "postgres"
+    CHANGE_FEED_BACKLOG_SIZE: int = 1000
+    CHANGE_FEED_QUEUE_SIZE: int = 1000
+    CHANGE_FEED_HEARTBEAT_SECONDS: float = 15
+    JOB_WORKERS: int = 2
+    JOB_MAX_QUEUED: int = 100
+    JOB_RESULT_DIR: str = "/tmp/sprout-jobs"
+    JOB_RESULT_RETENTION_HOURS: float = 24
+    JOB_HEARTBEAT_SECONDS: float = 30
+    IDEMPOTENCY_STORE: str = "memory"  # "memory" or "database"
+    IDEMPOTENCY_KEY_TTL_SECONDS: float = 86400
+    IDEMPOTENCY_LOCK_SECONDS: float = 60
+    IDEMPOTENCY_CACHE_MAX_SIZE: int = 10000
+    IDEMPOTENCY_PURGE_SECONDS: float = 3600
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    WEB_CONCURRENCY: Optional[int] = None
+    GRACEFUL_SHUTDOWN_SECONDS: int = 30
 
     model_config = SettingsConfigDict(env_file=".env")
 
+    @property
+    def replica_urls(self) -> list[str]:
+        """Read replica URLs from the comma-separated DATABASE_REPLICA_URLS"""
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
 settings = Settings()
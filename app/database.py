@@ -1,22 +1,217 @@
 """Database configuration"""
+import asyncio
+import logging
+import math
+import os
+import time
 from typing import AsyncGenerator
+from fastapi import Request
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.asyncio.session import async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import Session
 from app.config import settings
+from app import profiling
+from app.metrics import TimedQueuePool, instrument_engine
+
+logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
 async_engine = create_async_engine(
     settings.DATABASE_URL, 
     future=True,
-    echo=True,
+    echo=settings.DB_ECHO,
+    poolclass=TimedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
 )
 
 local_session = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    """Get database session"""
-    async_session = local_session
-    async with async_session() as db:
+replica_engines = [
+    create_async_engine(
+        url,
+        future=True,
+        echo=settings.DB_ECHO,
+        poolclass=TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+    )
+    for url in settings.replica_urls
+]
+
+all_engines = (async_engine, *replica_engines)
+
+for engine in all_engines:
+    instrument_engine(engine)
+    profiling.instrument_engine(engine)
+
+def _reset_pools_after_fork():
+    # A forked worker gets fresh pools; connections it inherited belong to the parent
+    for engine in all_engines:
+        engine.sync_engine.dispose(close=False)
+
+os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+async def warm_pools():
+    """Open `DB_POOL_SIZE` connections per engine so early requests don't pay for connecting"""
+    for engine in all_engines:
+        connections = await asyncio.gather(
+            *(engine.connect().start() for _ in range(settings.DB_POOL_SIZE)),
+            return_exceptions=True,
+        )
+        for connection in connections:
+            if isinstance(connection, BaseException):
+                logger.warning("Could not pre-warm %s: %s", engine.url, connection)
+            else:
+                await connection.close()
+
+async def dispose_engines():
+    """Close every pooled connection, for a graceful shutdown"""
+    for engine in all_engines:
+        await engine.dispose()
+
+replica_sessions = [
+    async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    for engine in replica_engines
+]
+
+class ReplicaRouter:
+    """Round-robin choice of read replicas that skips replicas which recently failed"""
+
+    def __init__(self, count: int, cooldown: float):
+        self.cooldown = cooldown
+        self._next = 0
+        self._down_until = [0.0] * count
+
+    def candidates(self) -> list[int]:
+        """Return healthy replica indexes, starting from the next one in rotation"""
+        count = len(self._down_until)
+        if not count:
+            return []
+
+        start = self._next
+        self._next = (self._next + 1) % count
+        now = time.monotonic()
+        indexes = [(start + offset) % count for offset in range(count)]
+        return [index for index in indexes if self._down_until[index] <= now]
+
+    def mark_down(self, index: int):
+        """Take a replica out of rotation for the cooldown period"""
+        self._down_until[index] = time.monotonic() + self.cooldown
+
+    def mark_up(self, index: int):
+        """Put a replica back into rotation"""
+        self._down_until[index] = 0.0
+
+replica_router = ReplicaRouter(len(replica_engines), settings.REPLICA_FAILURE_COOLDOWN_SECONDS)
+
+# Set on responses to requests that committed a write, holding the commit time.
+# It travels with the client, so the next read stays on the primary whichever
+# server process serves it.
+LAST_WRITE_COOKIE = "last_write"
+
+def record_write(session):
+    """Mark the request that `session` was opened for as having committed a write"""
+    request = session.info.get("request")
+    if request is not None:
+        request.state.committed_at = time.time()
+
+@event.listens_for(Session, "after_commit")
+def _record_commit(session: Session):
+    record_write(session)
+
+def _wrote_recently(request: Request) -> bool:
+    try:
+        written_at = float(request.cookies.get(LAST_WRITE_COOKIE, ""))
+    except ValueError:
+        return False
+    # Either way round, as the clocks of server hosts may differ slightly
+    return abs(time.time() - written_at) < settings.READ_YOUR_WRITES_SECONDS
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware setting the last write cookie when a request committed a write"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not replica_engines:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            committed_at = scope.get("state", {}).get("committed_at")
+            if message["type"] == "http.response.start" and committed_at is not None:
+                cookie = (
+                    f"{LAST_WRITE_COOKIE}={committed_at:.3f}; "
+                    f"Max-Age={math.ceil(settings.READ_YOUR_WRITES_SECONDS)}; "
+                    "Path=/; HttpOnly; SameSite=lax"
+                )
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Get database session on the primary"""
+    async with local_session(info={"request": request}) as db:
         yield db
+
+def _is_connection_failure(exc: Exception) -> bool:
+    # Connecting fails with OSError or a DBAPIError that has no statement; a
+    # connection that drops mid-query is reported as invalidated.
+    if isinstance(exc, OSError):
+        return True
+    return exc.connection_invalidated or exc.statement is None
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Get database session on a healthy read replica, falling back to the primary
+
+    The session connects on first use, so a request answered from a cache
+    never checks out a connection. A replica that fails to connect is taken
+    out of rotation; `monitor_replicas` finds unreachable ones before
+    requests do.
+    """
+    candidates = [] if _wrote_recently(request) else replica_router.candidates()
+    if not candidates:
+        async with local_session() as db:
+            yield db
+        return
+
+    index = candidates[0]
+    async with replica_sessions[index]() as db:
+        try:
+            yield db
+        except (DBAPIError, OSError) as exc:
+            if _is_connection_failure(exc):
+                replica_router.mark_down(index)
+            raise
+
+async def _probe(engine):
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+async def monitor_replicas():
+    """Probe every replica each REPLICA_HEALTH_CHECK_SECONDS, keeping unreachable ones out of rotation"""
+    interval = settings.REPLICA_HEALTH_CHECK_SECONDS
+    while replica_engines:
+        for index, engine in enumerate(replica_engines):
+            try:
+                await asyncio.wait_for(_probe(engine), timeout=interval)
+            except (DBAPIError, OSError, asyncio.TimeoutError):
+                logger.warning("Read replica %s is unreachable", engine.url)
+                replica_router.mark_down(index)
+            else:
+                replica_router.mark_up(index)
+        await asyncio.sleep(interval)
+
+def read_session() -> AsyncSession:
+    """Open a session on the next healthy read replica, or the primary if there is none"""
+    candidates = replica_router.candidates()
+    if candidates:
+        return replica_sessions[candidates[0]]()
+    return local_session()
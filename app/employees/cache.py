@@ -0,0 +1,46 @@
+"""In-process cache of serialized employee list pages"""
+import time
+from typing import Awaitable, Callable, Hashable
+from app.cache import TTLCache
+from app.config import settings
+from app.database import replica_engines
+from app.responses import dumps
+
+list_cache = TTLCache(
+    max_size=settings.EMPLOYEE_LIST_CACHE_MAX_SIZE,
+    ttl=settings.EMPLOYEE_LIST_CACHE_TTL_SECONDS,
+    name="employee_list",
+)
+
+_version = 0
+_bumped_at = 0.0
+
+def bump_version():
+    """Invalidate every cached page.
+
+    Each service function that writes employees calls it, and the change feed
+    broker calls it again for every event it delivers, so that with the
+    postgres broker the other server processes drop their pages too.
+    """
+    global _version, _bumped_at
+    _version += 1
+    _bumped_at = time.monotonic()
+    list_cache.clear()
+
+def _can_store() -> bool:
+    # Right after a write, a page read from a lagging replica may predate it
+    if not replica_engines:
+        return True
+    return time.monotonic() - _bumped_at > settings.READ_YOUR_WRITES_SECONDS
+
+async def cached_json(key: Hashable, load: Callable[[], Awaitable[dict]]) -> bytes:
+    """Return the JSON body cached under a key, loading and caching it on a miss"""
+    # The version is read before loading so a write that lands meanwhile
+    # leaves the page under a version nobody looks up anymore.
+    versioned_key = (_version, key)
+    body = list_cache.get(versioned_key)
+    if body is None:
+        body = dumps(await load())
+        if _can_store():
+            list_cache.set(versioned_key, body)
+    return body
@@ -0,0 +1,194 @@
+"""Change feed of employee mutations, fanned out to Server-Sent Events subscribers"""
+import asyncio
+import logging
+import uuid
+from collections import deque
+from typing import AsyncIterator, Optional, Protocol
+import orjson
+from sqlalchemy import text
+from app.config import settings
+from app.database import async_engine
+from app.employees import cache
+from app.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+# Tells a subscriber it may have missed events and should refetch what it shows
+RESET = {"event": "reset"}
+
+def event(kind: str, type_of_employee: str, employee: dict) -> dict:
+    """Build a `created`, `updated` or `deleted` event for one employee"""
+    return {"event": kind, "type_of_employee": type_of_employee, "employee": employee}
+
+class Subscription:
+    """Events waiting to be sent to one client, dropped once it falls `limit` behind"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.closed = False
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def push(self, item: dict):
+        if self.closed:
+            return
+        if self._queue.qsize() >= self.limit:
+            # Too slow to keep up; a reset lets the client resume from a fresh fetch
+            self.closed = True
+            item = RESET
+        self._queue.put_nowait(item)
+
+    async def get(self) -> dict:
+        return await self._queue.get()
+
+class Broker(Protocol):
+    """Publishes events to every subscriber, wherever they are connected."""
+
+    async def start(self): ...
+    async def stop(self): ...
+    async def publish(self, events: list[dict]): ...
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscription: ...
+    def unsubscribe(self, subscription: Subscription): ...
+
+class InMemoryBroker:
+    """Fans events out to subscribers of this process, keeping the latest in a ring buffer."""
+
+    def __init__(self, backlog_size: int, queue_size: int):
+        self.queue_size = queue_size
+        self._backlog: deque = deque(maxlen=backlog_size)
+        self._subscribers: set[Subscription] = set()
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def publish(self, events: list[dict]):
+        for item in events:
+            self._deliver({"id": uuid.uuid4().hex, **item})
+
+    def _deliver(self, item: dict):
+        # The writer has already invalidated its own list cache; this reaches every other process
+        cache.bump_version()
+        self._backlog.append(item)
+        for subscription in list(self._subscribers):
+            subscription.push(item)
+            if subscription.closed:
+                self._subscribers.discard(subscription)
+
+    def _reset_all(self):
+        # Events may have been missed, and with them list cache invalidations
+        cache.bump_version()
+        for subscription in self._subscribers:
+            subscription.push(RESET)
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscription:
+        """Subscribe to new events, first replaying those after `last_event_id`"""
+        subscription = Subscription(self.queue_size)
+        if last_event_id is not None:
+            ids = [item["id"] for item in self._backlog]
+            if last_event_id in ids:
+                for item in list(self._backlog)[ids.index(last_event_id) + 1:]:
+                    subscription.push(item)
+            else:
+                # The event has left the ring buffer (or came from before a restart)
+                subscription.push(RESET)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+class PostgresBroker(InMemoryBroker):
+    """Relays events between server processes through PostgreSQL LISTEN/NOTIFY.
+
+    Every process, the publisher included, delivers events as they arrive on
+    the channel, so all processes see them in the same commit order.
+    """
+
+    def __init__(self, backlog_size: int, queue_size: int, channel: str):
+        super().__init__(backlog_size, queue_size)
+        self.channel = channel
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+
+    async def publish(self, events: list[dict]):
+        if not events:
+            return
+        payloads = [dumps({"id": uuid.uuid4().hex, **item}).decode() for item in events]
+        try:
+            async with async_engine.begin() as connection:
+                await connection.execute(
+                    text(
+                        "SELECT pg_notify(:channel, payload) "
+                        "FROM unnest(CAST(:payloads AS text[])) AS payload"
+                    ),
+                    {"channel": self.channel, "payloads": payloads},
+                )
+        except Exception:
+            # The write has already committed; subscribers will catch up on their next fetch
+            logger.exception("Could not publish %d employee change events", len(payloads))
+
+    async def _listen(self):
+        """Hold a LISTEN connection open, reconnecting (and resetting subscribers) if it drops"""
+        def on_notification(connection, pid, channel, payload):
+            self._deliver(orjson.loads(payload))
+
+        while True:
+            try:
+                async with async_engine.connect() as connection:
+                    raw_connection = (await connection.get_raw_connection()).driver_connection
+                    await raw_connection.add_listener(self.channel, on_notification)
+                    try:
+                        while not raw_connection.is_closed():
+                            await asyncio.sleep(settings.CHANGE_FEED_HEARTBEAT_SECONDS)
+                    finally:
+                        if not raw_connection.is_closed():
+                            await raw_connection.remove_listener(self.channel, on_notification)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Change feed listener failed, reconnecting")
+            self._reset_all()
+            await asyncio.sleep(1)
+
+def _create_broker() -> Broker:
+    if settings.CHANGE_FEED_BROKER == "postgres":
+        return PostgresBroker(
+            settings.CHANGE_FEED_BACKLOG_SIZE, settings.CHANGE_FEED_QUEUE_SIZE, "employee_changes"
+        )
+    return InMemoryBroker(settings.CHANGE_FEED_BACKLOG_SIZE, settings.CHANGE_FEED_QUEUE_SIZE)
+
+broker = _create_broker()
+
+def _format(item: dict) -> str:
+    if item is RESET:
+        return "event: reset\ndata: {}\n\n"
+    data = {key: value for key, value in item.items() if key not in ("id", "event")}
+    return f"id: {item['id']}\nevent: {item['event']}\ndata: {dumps(data).decode()}\n\n"
+
+async def stream(last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+    """Yield Server-Sent Events for new changes, with comment heartbeats while idle"""
+    subscription = broker.subscribe(last_event_id)
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(
+                    subscription.get(), timeout=settings.CHANGE_FEED_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+
+            yield _format(item)
+            if item is RESET and subscription.closed:
+                return
+    finally:
+        broker.unsubscribe(subscription)
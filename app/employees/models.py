@@ -3,12 +3,26 @@ This module contains SQLAlchemy models for the employees.
 """
 import uuid
 from datetime import date
+from sqlalchemy import BigInteger, Index
 from sqlalchemy.dialects.postgresql import UUID as SQLAlchemyUUID
 from sqlalchemy.orm import Mapped, mapped_column
 from app.database import Base
 
+def trigram_indexes(table_name: str, *columns: str):
+    """GIN trigram indexes backing prefix and fuzzy search on the given columns"""
+    return tuple(
+        Index(
+            f"ix_{table_name}_{column}_trgm",
+            column,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+        for column in columns
+    )
+
 class RegularEmployee(Base):
     __tablename__ = "regular_employees"
+    __table_args__ = trigram_indexes("regular_employees", "first_name", "last_name", "email")
 
     id: Mapped[SQLAlchemyUUID] = mapped_column(
         SQLAlchemyUUID(as_uuid=True),
@@ -22,9 +36,15 @@ class RegularEmployee(Base):
     email: Mapped[str] = mapped_column(unique=True, index=True)
     number_of_leaves: Mapped[int] = mapped_column()
     benefits: Mapped[str] = mapped_column()
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
 
 class ContractualEmployee(Base):
     __tablename__ = "contractual_employees"
+    __table_args__ = (
+        *trigram_indexes("contractual_employees", "first_name", "last_name", "email"),
+        # Serves expiry range scans in (contract_end_date, id) keyset order
+        Index("ix_contractual_employees_contract_end_date_id", "contract_end_date", "id"),
+    )
 
     id: Mapped[SQLAlchemyUUID] = mapped_column(
         SQLAlchemyUUID(as_uuid=True),
@@ -38,3 +58,12 @@ class ContractualEmployee(Base):
     email: Mapped[str] = mapped_column(unique=True, index=True)
     contract_end_date: Mapped[date] = mapped_column()
     project: Mapped[str] = mapped_column()
+    version: Mapped[int] = mapped_column(default=1, server_default="1")
+
+class WorkforceStat(Base):
+    """One running total of the workforce statistics, e.g. ("headcount", "regular")"""
+    __tablename__ = "workforce_stats"
+
+    metric: Mapped[str] = mapped_column(primary_key=True)
+    key: Mapped[str] = mapped_column(primary_key=True, default="")
+    value: Mapped[int] = mapped_column(BigInteger)
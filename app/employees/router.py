@@ -1,59 +1,252 @@
 """Employee routes module"""
+import os
+from datetime import date
+from functools import partial
+from typing import Optional, Union
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, UploadFile
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from app.auth.utils import get_current_user
-from app.database import get_db
-from app.employees import schemas, services
+from app.config import settings
+from app.database import get_db, get_read_db
+from app.employees import cache, changes, schemas, services, stats
+from app.idempotency.store import idempotent
+from app.responses import ORJSONResponse
 from app.auth import schemas as auth_schemas
+from app.jobs import schemas as job_schemas
+from app.jobs.runner import runner
 
 router = APIRouter(prefix="/api/employees", tags=["employees"])
 
-@router.get("/regular", response_model=list[schemas.RegularEmployee])
+@router.get("/regular", response_model=schemas.RegularEmployeePage)
 async def read_regular_employees(
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.EMPLOYEE_PAGE_SIZE, ge=1, le=settings.EMPLOYEE_MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: auth_schemas.User = Depends(get_current_user)
 ):
-    """Get all regular employees"""
-    employees = await services.get_regular_employees(db)
-    return employees
+    """Get a page of regular employees"""
+    body = await cache.cached_json(
+        ("regular", cursor, limit, fields),
+        lambda: services.get_regular_employees(db, limit, cursor, fields),
+    )
+    return Response(content=body, media_type="application/json")
 
 
-@router.get("/contractual", response_model=list[schemas.ContractualEmployee])
+@router.get("/contractual", response_model=schemas.ContractualEmployeePage)
 async def read_contractual_employees(
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.EMPLOYEE_PAGE_SIZE, ge=1, le=settings.EMPLOYEE_MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: auth_schemas.User = Depends(get_current_user)
+):
+    """Get a page of contractual employees"""
+    body = await cache.cached_json(
+        ("contractual", cursor, limit, fields),
+        lambda: services.get_contractual_employees(db, limit, cursor, fields),
+    )
+    return Response(content=body, media_type="application/json")
+
+@router.get("/contractual/expiring", response_model=schemas.ContractualEmployeePage)
+async def read_expiring_contractual_employees(
+    before: Optional[date] = Query(None, description="Only contracts ending before this date"),
+    after: Optional[date] = Query(None, description="Only contracts ending on or after this date"),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.EMPLOYEE_PAGE_SIZE, ge=1, le=settings.EMPLOYEE_MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: auth_schemas.User = Depends(get_current_user)
 ):
-    """Get all contractual employees"""
-    employees = await services.get_contractual_employees(db)
-    return employees
+    """Get a page of contractual employees by contract end date, soonest first"""
+    body = await cache.cached_json(
+        ("expiring", before, after, cursor, limit, fields),
+        lambda: services.get_expiring_contractual_employees(db, limit, cursor, before, after, fields),
+    )
+    return Response(content=body, media_type="application/json")
 
-@router.get("/")
+@router.get("/", response_model=schemas.EmployeePage)
 async def read_employees(
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.EMPLOYEE_PAGE_SIZE, ge=1, le=settings.EMPLOYEE_MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: auth_schemas.User = Depends(get_current_user)
+):
+    """Get a page of all employees"""
+    body = await cache.cached_json(
+        ("all", cursor, limit, fields),
+        lambda: services.get_all_employees(db, limit, cursor, fields),
+    )
+    return Response(content=body, media_type="application/json")
+
+@router.get(
+    "/search",
+    response_model=list[Union[schemas.RegularEmployee, schemas.ContractualEmployee]],
+)
+async def search_employees(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(settings.EMPLOYEE_SEARCH_LIMIT, ge=1, le=settings.EMPLOYEE_SEARCH_MAX_LIMIT),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: auth_schemas.User = Depends(get_current_user)
+):
+    """Search employees by name or email, with prefix and fuzzy matching"""
+    return await services.search_employees(q, limit, db)
+
+@router.get("/stats", response_model=schemas.WorkforceStats)
+async def read_workforce_stats(current_user: auth_schemas.User = Depends(get_current_user)):
+    """Get headcount, leave and contract expiry totals"""
+    return await stats.snapshot()
+
+@router.post("/stats/reconcile", status_code=202, response_model=job_schemas.Job)
+async def reconcile_workforce_stats(
+    response: Response,
+    current_user: auth_schemas.User = Depends(get_current_user)
+):
+    """Start recomputing the workforce statistics from the database"""
+    job = await runner.submit("stats_reconcile", stats.reconcile_job)
+    response.headers["Location"] = f"/api/jobs/{job.id}"
+    return job
+
+@router.get("/changes")
+async def stream_employee_changes(
+    last_event_id: Optional[str] = Query(None, description="Resume after this event"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+    current_user: auth_schemas.User = Depends(get_current_user)
+):
+    """Stream created, updated and deleted employees as Server-Sent Events"""
+    return StreamingResponse(
+        changes.stream(last_event_id_header or last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/export")
+async def export_employees(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    current_user: auth_schemas.User = Depends(get_current_user)
+):
+    """Stream every employee as NDJSON or CSV"""
+    return StreamingResponse(
+        services.export_employees(export_format),
+        media_type=services.EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename=employees.{export_format}"},
+    )
+
+@router.post("/export/jobs", status_code=202, response_model=job_schemas.Job)
+async def export_employees_job(
+    response: Response,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    current_user: auth_schemas.User = Depends(get_current_user)
+):
+    """Start a background export whose file is downloaded from the job once it succeeds"""
+    job = await runner.submit("employee_export", partial(services.export_employees_job, export_format))
+    response.headers["Location"] = f"/api/jobs/{job.id}"
+    return job
+
+def _check_bulk_size(items: list):
+    if len(items) > settings.EMPLOYEE_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.EMPLOYEE_BULK_MAX_ITEMS} employees can be sent at once",
+        )
+
+def _idempotency_scope(http_request: Request, current_user: auth_schemas.User) -> tuple:
+    return (current_user.username, http_request.method, http_request.url.path)
+
+@router.post("/bulk", response_model=list[schemas.BulkItemResult])
+async def bulk_create_employees(
+    requests: list[schemas.EmployeeCreateRequest],
+    http_request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: auth_schemas.User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """Create many employees, reporting the outcome of each one"""
+    _check_bulk_size(requests)
+    return await idempotent(
+        idempotency_key, _idempotency_scope(http_request, current_user), requests,
+        lambda: services.bulk_create_employees(requests, db),
+    )
+
+@router.put("/bulk", response_model=list[schemas.BulkItemResult])
+async def bulk_update_employees(
+    requests: list[schemas.EmployeeBulkUpdateItem],
+    http_request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: auth_schemas.User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """Update many employees, reporting the outcome of each one"""
+    _check_bulk_size(requests)
+    return await idempotent(
+        idempotency_key, _idempotency_scope(http_request, current_user), requests,
+        lambda: services.bulk_update_employees(requests, db),
+    )
+
+@router.delete("/bulk", response_model=list[schemas.BulkItemResult])
+async def bulk_delete_employees(
+    requests: list[schemas.EmployeeBulkDeleteItem],
+    db: AsyncSession = Depends(get_db),
+    current_user: auth_schemas.User = Depends(get_current_user)
+):
+    """Delete many employees, reporting the outcome of each one"""
+    _check_bulk_size(requests)
+    return await services.bulk_delete_employees(requests, db)
+
+@router.post("/import", response_model=schemas.ImportSummary)
+async def import_employees(
+    file: UploadFile,
     db: AsyncSession = Depends(get_db),
     current_user: auth_schemas.User = Depends(get_current_user)
 ):
-    """Get all employees"""
-    employees = await services.get_all_employees(db)
-    return employees
+    """Import employees from a CSV file with a `type_of_employee` column"""
+    return await services.import_employees(file.file, db)
+
+@router.post("/import/jobs", status_code=202, response_model=job_schemas.Job)
+async def import_employees_job(
+    file: UploadFile,
+    response: Response,
+    current_user: auth_schemas.User = Depends(get_current_user)
+):
+    """Start a background import of a CSV file, reporting progress on the job"""
+    path = await services.spool_upload(file.file)
+    try:
+        job = await runner.submit("employee_import", partial(services.import_employees_job, path))
+    except HTTPException:
+        os.remove(path)
+        raise
+    response.headers["Location"] = f"/api/jobs/{job.id}"
+    return job
 
 @router.get("/{employee_id}")
 async def read_employee(
     employee_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: auth_schemas.User = Depends(get_current_user)
 ):
     """Get a single employee by their ID (UUID)"""
-    employee = await services.get_employee(employee_id, db)
-    return employee
+    employee = await services.get_employee(employee_id, db, fields)
+    return ORJSONResponse(employee)
 
 @router.post("/")
 async def create_employee(
     request: schemas.EmployeeCreateRequest,
+    http_request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: auth_schemas.User = Depends(get_current_user)
+    current_user: auth_schemas.User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """Create a new employee"""
+    return await idempotent(
+        idempotency_key, _idempotency_scope(http_request, current_user), request,
+        lambda: _create_employee(request, db),
+    )
+
+async def _create_employee(request: schemas.EmployeeCreateRequest, db: AsyncSession):
     type_of_employee = request.type_of_employee
     employee_data = request.employee
 
@@ -71,20 +264,34 @@ async def create_employee(
 async def update_employee(
     employee_id: UUID,
     request: schemas.EmployeeUpdateRequest,
+    http_request: Request,
     db: AsyncSession = Depends(get_db),
-    current_user: auth_schemas.User = Depends(get_current_user)
+    current_user: auth_schemas.User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """Update an employee's details by their ID (UUID)"""
+    return await idempotent(
+        idempotency_key, _idempotency_scope(http_request, current_user), request,
+        lambda: _update_employee(employee_id, request, db),
+    )
+
+async def _update_employee(
+    employee_id: UUID, request: schemas.EmployeeUpdateRequest, db: AsyncSession
+):
     type_of_employee = request.type_of_employee
     updated_employee_data = request.employee
 
     if type_of_employee == "regular":
         updated_employee = schemas.RegularEmployeeUpdate(**updated_employee_data.dict())
-        return await services.update_regular_employee(employee_id, updated_employee, db)
+        return await services.update_regular_employee(
+            employee_id, updated_employee, db, request.version
+        )
 
     if type_of_employee == "contractual":
         updated_employee = schemas.ContractualEmployeeUpdate(**updated_employee_data.dict())
-        return await services.update_contractual_employee(employee_id, updated_employee, db)
+        return await services.update_contractual_employee(
+            employee_id, updated_employee, db, request.version
+        )
 
     raise HTTPException(status_code=400, detail="Invalid employee type")
 
@@ -3,7 +3,7 @@ This module contains the Pydantic models
 for the RegularEmployee and ContractualEmployee classes
 """
 from uuid import UUID
-from datetime import date
+from datetime import date, datetime
 from typing import Optional, Union
 from pydantic import BaseModel, ConfigDict
 
@@ -21,6 +21,7 @@ class RegularEmployeeCreate(RegularEmployeeBase):
 
 class RegularEmployee(RegularEmployeeBase):
     id: UUID
+    version: int
     model_config = ConfigDict(from_attributes=True)
 
 class ContractualEmployeeBase(EmployeeBase):
@@ -32,8 +33,21 @@ class ContractualEmployeeCreate(ContractualEmployeeBase):
 
 class ContractualEmployee(ContractualEmployeeBase):
     id: UUID
+    version: int
     model_config = ConfigDict(from_attributes=True)
 
+class RegularEmployeePage(BaseModel):
+    items: list[RegularEmployee]
+    next_cursor: Optional[str] = None
+
+class ContractualEmployeePage(BaseModel):
+    items: list[ContractualEmployee]
+    next_cursor: Optional[str] = None
+
+class EmployeePage(BaseModel):
+    items: list[Union[RegularEmployee, ContractualEmployee]]
+    next_cursor: Optional[str] = None
+
 class EmployeeCreateRequest(BaseModel):
     type_of_employee: str
     employee: Union[RegularEmployeeCreate, ContractualEmployeeCreate]
@@ -55,3 +69,34 @@ class ContractualEmployeeUpdate(BaseModel):
 class EmployeeUpdateRequest(BaseModel):
     type_of_employee: str  # "regular" or "contractual"
     employee: Union[RegularEmployeeUpdate, ContractualEmployeeUpdate]
+    version: Optional[int] = None  # expected current version, for optimistic concurrency
+
+class EmployeeBulkUpdateItem(EmployeeUpdateRequest):
+    id: UUID
+
+class EmployeeBulkDeleteItem(BaseModel):
+    id: UUID
+    type_of_employee: str  # "regular" or "contractual"
+
+class BulkItemResult(BaseModel):
+    index: int
+    status_code: int
+    employee: Optional[Union[RegularEmployee, ContractualEmployee]] = None
+    detail: Optional[str] = None
+
+class ImportRowError(BaseModel):
+    line: int
+    detail: str
+
+class ImportSummary(BaseModel):
+    accepted: int = 0
+    rejected: int = 0
+    errors: list[ImportRowError] = []
+
+class WorkforceStats(BaseModel):
+    headcount: dict[str, int]
+    headcount_by_project: dict[str, int]
+    total_leaves: int
+    average_leaves: Optional[float] = None
+    contracts_expiring_by_month: dict[str, int]  # keyed by "YYYY-MM"
+    reconciled_at: Optional[datetime] = None
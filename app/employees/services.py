@@ -1,49 +1,295 @@
 """This module contains the business logic for the employees service"""
+import csv
+import io
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from collections import Counter, defaultdict
+from itertools import islice
+from datetime import date
+from typing import Awaitable, BinaryIO, Callable, Optional
 from uuid import UUID
 from fastapi import HTTPException
-from sqlalchemy import select
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import (
+    Date, Integer, String, cast, column, delete, func, literal, null, or_, select, text, tuple_,
+    union_all, update, values
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio.session import AsyncSession
-from app.employees import schemas
+from app.coalescer import Coalescer
+from app.config import settings
+from app.database import local_session, read_session, record_write
+from app.employees import cache, changes, schemas, stats, utils
 from app.employees.models import ContractualEmployee, RegularEmployee
+from app.responses import dumps
 
 
-async def get_regular_employees(db: AsyncSession):
-    """Get all regular employees"""
-    result = await db.execute(select(RegularEmployee))
-    employees = result.scalars().all()
-    return [schemas.RegularEmployee.model_validate(employee) for employee in employees]
+def _paginate(rows: list, limit: int):
+    """Split a `limit + 1` row fetch into a page and the cursor for the next one"""
+    if len(rows) <= limit:
+        return rows, None
+    items = rows[:limit]
+    return items, utils.encode_cursor(items[-1].id)
 
-async def get_contractual_employees(db: AsyncSession):
-    """Get all contractual employees"""
-    result = await db.execute(select(ContractualEmployee))
-    employees = result.scalars().all()
-    return [schemas.ContractualEmployee.model_validate(employee) for employee in employees]
+async def _fetch_page(
+    source, columns: list[str], db: AsyncSession, limit: int, cursor: Optional[str], to_dict=None
+):
+    """Fetch a page of Core rows from a table or the employees union, ordered by ID"""
+    query = select(*(source.c[column] for column in columns))
+    query = query.order_by(source.c.id).limit(limit + 1)
+    if cursor:
+        query = query.where(source.c.id > utils.decode_cursor(cursor))
+
+    result = await db.execute(query)
+    rows, next_cursor = _paginate(result.all(), limit)
+    to_dict = to_dict or (lambda row: row._asdict())
+    return {"items": [to_dict(row) for row in rows], "next_cursor": next_cursor}
+
+async def get_regular_employees(
+    db: AsyncSession, limit: int, cursor: Optional[str] = None, fields: Optional[str] = None
+):
+    """Get a page of regular employees ordered by their ID"""
+    table = RegularEmployee.__table__
+    columns = utils.parse_fields(fields, table.c.keys()) or table.c.keys()
+    return await _fetch_page(table, columns, db, limit, cursor)
+
+async def get_contractual_employees(
+    db: AsyncSession, limit: int, cursor: Optional[str] = None, fields: Optional[str] = None
+):
+    """Get a page of contractual employees ordered by their ID"""
+    table = ContractualEmployee.__table__
+    columns = utils.parse_fields(fields, table.c.keys()) or table.c.keys()
+    return await _fetch_page(table, columns, db, limit, cursor)
+
+async def get_expiring_contractual_employees(
+    db: AsyncSession,
+    limit: int,
+    cursor: Optional[str] = None,
+    before: Optional[date] = None,
+    after: Optional[date] = None,
+    fields: Optional[str] = None,
+):
+    """Get a page of contractual employees whose contracts end in [after, before), soonest first"""
+    table = ContractualEmployee.__table__
+    columns = utils.parse_fields(fields, table.c.keys()) or table.c.keys()
+    # The end date is always selected since cursors are built from it
+    columns = list(dict.fromkeys([*columns, "contract_end_date"]))
+
+    order = (table.c.contract_end_date, table.c.id)
+    query = select(*(table.c[column] for column in columns)).order_by(*order).limit(limit + 1)
+    if after:
+        query = query.where(table.c.contract_end_date >= after)
+    if before:
+        query = query.where(table.c.contract_end_date < before)
+    if cursor:
+        query = query.where(tuple_(*order) > tuple_(*utils.decode_date_cursor(cursor)))
+
+    rows = (await db.execute(query)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = utils.encode_date_cursor(rows[-1].contract_end_date, rows[-1].id)
+    return {"items": [row._asdict() for row in rows], "next_cursor": next_cursor}
+
+def _employees_union():
+    """Select both employee tables as one UNION ALL of a common row shape"""
+    regular = select(
+        RegularEmployee.id,
+        literal("regular").label("type_of_employee"),
+        RegularEmployee.first_name,
+        RegularEmployee.last_name,
+        RegularEmployee.email,
+        RegularEmployee.number_of_leaves,
+        RegularEmployee.benefits,
+        cast(null(), Date).label("contract_end_date"),
+        cast(null(), String).label("project"),
+        RegularEmployee.version,
+    )
+    contractual = select(
+        ContractualEmployee.id,
+        literal("contractual").label("type_of_employee"),
+        ContractualEmployee.first_name,
+        ContractualEmployee.last_name,
+        ContractualEmployee.email,
+        cast(null(), Integer).label("number_of_leaves"),
+        cast(null(), String).label("benefits"),
+        ContractualEmployee.contract_end_date,
+        ContractualEmployee.project,
+        ContractualEmployee.version,
+    )
+    return union_all(regular, contractual).subquery("employees")
+
+# Columns of each type of employee, used to shape rows of the employees union
+EMPLOYEE_COLUMNS = {
+    "regular": RegularEmployee.__table__.c.keys(),
+    "contractual": ContractualEmployee.__table__.c.keys(),
+}
+
+def _employee_dict(row) -> dict:
+    """Keep only the columns that belong to the type of a row of the employees union"""
+    mapping = row._mapping
+    return {column: mapping[column] for column in EMPLOYEE_COLUMNS[row.type_of_employee]}
+
+def _employee_from_row(row):
+    """Build the schema matching the type of a row of the employees union"""
+    if row.type_of_employee == "regular":
+        return schemas.RegularEmployee.model_validate(row, from_attributes=True)
+    return schemas.ContractualEmployee.model_validate(row, from_attributes=True)
 
-async def get_employee(employee_id: UUID, db: AsyncSession):
+async def get_employee(employee_id: UUID, db: AsyncSession, fields: Optional[str] = None):
     """Get a single employee by their ID (UUID)."""
-    # Check for RegularEmployee first
-    result = await db.execute(select(RegularEmployee).filter(RegularEmployee.id == employee_id))
-    employee = result.scalars().first()
-    if employee:
-        return schemas.RegularEmployee.model_validate(employee)
-
-    # Check for ContractualEmployee if not found in RegularEmployee
-    result = await db.execute(select(ContractualEmployee).filter(ContractualEmployee.id == employee_id))
-    employee = result.scalars().first()
-    if employee:
-        return schemas.ContractualEmployee.model_validate(employee)
+    employees = _employees_union()
+    columns = utils.parse_fields(fields, employees.c.keys())
+    if columns:
+        query = select(*(employees.c[column] for column in columns))
+    else:
+        query = select(employees)
+
+    result = await db.execute(query.where(employees.c.id == employee_id))
+    row = result.first()
+    if row:
+        return row._asdict() if columns else _employee_dict(row)
 
     # Raise an HTTPException if employee is not found in either table
     raise HTTPException(status_code=404, detail="Employee not found")
 
-async def get_all_employees(db: AsyncSession):
-    """Get all employees"""
-    regular_employees = await get_regular_employees(db)
-    contractual_employees = await get_contractual_employees(db)
-    return regular_employees + contractual_employees
+async def get_all_employees(
+    db: AsyncSession, limit: int, cursor: Optional[str] = None, fields: Optional[str] = None
+):
+    """Get a page of regular and contractual employees merged by their ID"""
+    employees = _employees_union()
+    columns = utils.parse_fields(fields, employees.c.keys())
+    if columns:
+        return await _fetch_page(employees, columns, db, limit, cursor)
+    return await _fetch_page(employees, employees.c.keys(), db, limit, cursor, _employee_dict)
+
+async def search_employees(q: str, limit: int, db: AsyncSession):
+    """Search both tables by name and email prefix or trigram similarity, best matches first"""
+    employees = _employees_union()
+    columns = (employees.c.first_name, employees.c.last_name, employees.c.email)
+    pattern = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+    # Both predicates can be answered by the gin_trgm_ops indexes on each table
+    prefix_match = or_(*(column.ilike(pattern, escape="\\") for column in columns))
+    fuzzy_match = or_(*(column.op("%")(q) for column in columns))
+    score = func.greatest(*(func.similarity(column, q) for column in columns))
+
+    query = (
+        select(employees)
+        .where(or_(prefix_match, fuzzy_match))
+        .order_by(prefix_match.desc(), score.desc(), employees.c.id)
+        .limit(limit)
+    )
+    result = await db.execute(query)
+    return [_employee_from_row(row) for row in result]
+
+EXPORT_COLUMNS = [
+    "id",
+    "type_of_employee",
+    "first_name",
+    "last_name",
+    "email",
+    "number_of_leaves",
+    "benefits",
+    "contract_end_date",
+    "project",
+    "version",
+]
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+async def export_employees(export_format: str):
+    """Stream every regular and contractual employee as NDJSON lines or CSV rows"""
+    # The session is opened here rather than injected because the generator
+    # keeps running after the route handler has returned its response.
+    async with read_session() as db:
+        # One snapshot for both tables so the export is consistent
+        await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+        if export_format == "csv":
+            yield _to_csv([EXPORT_COLUMNS])
+
+        for type_of_employee, model in (
+            ("regular", RegularEmployee),
+            ("contractual", ContractualEmployee),
+        ):
+            query = select(model.__table__).execution_options(
+                yield_per=settings.EMPLOYEE_EXPORT_CHUNK_SIZE
+            )
+            result = await db.stream(query)
+            async for rows in result.mappings().partitions():
+                records = [{**row, "type_of_employee": type_of_employee} for row in rows]
+                if export_format == "csv":
+                    yield _to_csv(
+                        [record.get(column) for column in EXPORT_COLUMNS] for record in records
+                    )
+                else:
+                    yield b"".join(dumps(record) + b"\n" for record in records)
+
+def _to_csv(rows) -> str:
+    """Render rows as CSV text"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+async def export_employees_job(export_format: str, report: Callable[[dict], Awaitable[None]]):
+    """Write a full export to a file under JOB_RESULT_DIR, for download once the job is done"""
+    name = f"employees-{uuid.uuid4()}.{export_format}"
+    path = os.path.join(settings.JOB_RESULT_DIR, name)
+    os.makedirs(settings.JOB_RESULT_DIR, exist_ok=True)
+
+    written = 0
+    reported_at = time.monotonic()
+    try:
+        with open(path, "wb") as output:
+            async for chunk in export_employees(export_format):
+                data = chunk.encode() if isinstance(chunk, str) else chunk
+                await run_in_threadpool(output.write, data)
+                written += len(data)
+                # Progress is a database write, so report it at most once a second
+                if time.monotonic() - reported_at >= 1:
+                    await report({"bytes": written})
+                    reported_at = time.monotonic()
+    except BaseException:
+        os.remove(path)
+        raise
+
+    return {
+        "file": name,
+        "filename": f"employees.{export_format}",
+        "media_type": EXPORT_MEDIA_TYPES[export_format],
+        "bytes": written,
+    }
+
+async def _create_coalesced(type_of_employee: str, employee, db: AsyncSession):
+    """Create an employee as part of a group-committed batch"""
+    created = await create_coalescer.submit(type_of_employee, employee)
+    # The batch committed on its own session; mark this request for read-your-writes
+    record_write(db)
+    return created
+
+async def _commit_created(db: AsyncSession, type_of_employee: str, employee):
+    """Commit a new employee, answering a taken email with a 409 rather than a 500"""
+    try:
+        await db.flush()
+    except IntegrityError as exc:
+        await db.rollback()
+        if _is_unique_violation(exc):
+            raise HTTPException(status_code=409, detail="Email already exists") from exc
+        raise
+    await stats.record(db, added=[(type_of_employee, employee)])
+    await db.commit()
 
 async def create_regular_employee(employee: schemas.RegularEmployeeCreate, db: AsyncSession):
     """Create a new regular employee"""
+    if settings.EMPLOYEE_CREATE_COALESCE_WINDOW_MS > 0:
+        return await _create_coalesced("regular", employee, db)
+
     db_employee = RegularEmployee(
         first_name=employee.first_name,
         last_name=employee.last_name,
@@ -53,7 +299,9 @@ async def create_regular_employee(employee: schemas.RegularEmployeeCreate, db: A
     )
 
     db.add(db_employee)
-    await db.commit()
+    await _commit_created(db, "regular", employee)
+    cache.bump_version()
+    await changes.broker.publish([_employee_event("created", "regular", db_employee)])
 
     return db_employee
 
@@ -62,6 +310,9 @@ async def create_contractual_employee(
         db: AsyncSession
 ):
     """Create a new contractual employee"""
+    if settings.EMPLOYEE_CREATE_COALESCE_WINDOW_MS > 0:
+        return await _create_coalesced("contractual", employee, db)
+
     db_employee = ContractualEmployee(
         first_name=employee.first_name,
         last_name=employee.last_name,
@@ -71,64 +322,541 @@ async def create_contractual_employee(
     )
 
     db.add(db_employee)
-    await db.commit()
+    await _commit_created(db, "contractual", employee)
+    cache.bump_version()
+    await changes.broker.publish([_employee_event("created", "contractual", db_employee)])
 
     return db_employee
 
-async def update_regular_employee(
+def _update_statement(
+    table,
+    type_of_employee: str,
     employee_id: UUID,
-    updated_employee_data: schemas.RegularEmployeeUpdate,
-    db: AsyncSession
+    values: dict,
+    expected_version: Optional[int],
+    previous: Optional[dict] = None,
 ):
-    """Update a regular employee's details by their ID (UUID)"""
-    existing_employee = await db.get(RegularEmployee, employee_id)
-    if not existing_employee:
-        raise HTTPException(status_code=404, detail="Regular Employee not found")
+    """Build an UPDATE ... RETURNING that bumps the row version, optionally checking it first
+
+    The pre-update values the statistics need come back as `old_*`, from a
+    locked self-join, or from `previous` when they were read beforehand.
+    """
+    stat_columns = stats.STAT_COLUMNS[type_of_employee]
+    query = update(table).where(table.c.id == employee_id)
+    if previous is None:
+        old = select(table).where(table.c.id == employee_id).with_for_update().subquery("old")
+        query = query.where(table.c.id == old.c.id)
+        old_values = [old.c[column] for column in stat_columns]
+    else:
+        old_values = [literal(previous[column], table.c[column].type) for column in stat_columns]
+    if expected_version is not None:
+        query = query.where(table.c.version == expected_version)
+    previous_columns = (
+        value.label(f"old_{column}") for column, value in zip(stat_columns, old_values)
+    )
+    return query.values(**values, version=table.c.version + 1).returning(*table.c, *previous_columns)
 
-    for key, value in updated_employee_data.dict(exclude_unset=True).items():
-        setattr(existing_employee, key, value)
+async def _read_previous(table, type_of_employee: str, employee_id: UUID, db: AsyncSession):
+    # SQLite (for the benchmarks) resolves the self-join's columns to the updated row
+    # in RETURNING; its write transactions are serialized, so a prior read stays current.
+    columns = (table.c[column] for column in stats.STAT_COLUMNS[type_of_employee])
+    result = await db.execute(select(*columns).where(table.c.id == employee_id))
+    return result.mappings().first()
+
+async def _exists(table, employee_id: UUID, db: AsyncSession) -> bool:
+    result = await db.execute(select(table.c.id).where(table.c.id == employee_id))
+    return result.first() is not None
+
+async def _update_employee(
+    table,
+    type_of_employee: str,
+    schema,
+    employee_id: UUID,
+    values: dict,
+    expected_version: Optional[int],
+    db: AsyncSession,
+    not_found_detail: str,
+):
+    """Update an employee in a single statement, detecting missing rows and stale versions"""
+    previous = None
+    if db.get_bind().dialect.name == "sqlite":
+        previous = await _read_previous(table, type_of_employee, employee_id, db)
+        if previous is None:
+            await db.rollback()
+            raise HTTPException(status_code=404, detail=not_found_detail)
+    result = await db.execute(
+        _update_statement(table, type_of_employee, employee_id, values, expected_version, previous)
+    )
+    row = result.first()
+    if row is None:
+        # Only a failed version check needs a second look to tell 409 from 404
+        if expected_version is not None and await _exists(table, employee_id, db):
+            await db.rollback()
+            raise HTTPException(
+                status_code=409, detail="Employee was modified by another request"
+            )
+        await db.rollback()
+        raise HTTPException(status_code=404, detail=not_found_detail)
 
+    await stats.record(db, replaced=[(type_of_employee, row)])
     await db.commit()
-    await db.refresh(existing_employee)
+    cache.bump_version()
+    await changes.broker.publish([_employee_event("updated", type_of_employee, row)])
+    return schema.model_validate(row, from_attributes=True)
 
-    return existing_employee
+async def update_regular_employee(
+    employee_id: UUID,
+    updated_employee_data: schemas.RegularEmployeeUpdate,
+    db: AsyncSession,
+    expected_version: Optional[int] = None
+):
+    """Update a regular employee's details by their ID (UUID)"""
+    return await _update_employee(
+        RegularEmployee.__table__,
+        "regular",
+        schemas.RegularEmployee,
+        employee_id,
+        updated_employee_data.model_dump(exclude_unset=True),
+        expected_version,
+        db,
+        "Regular Employee not found",
+    )
 
 async def update_contractual_employee(
     employee_id: UUID,
     updated_employee_data: schemas.ContractualEmployeeUpdate,
-    db: AsyncSession
+    db: AsyncSession,
+    expected_version: Optional[int] = None
 ):
     """Update a contractual employee's details by their ID (UUID)"""
-    existing_employee = await db.get(ContractualEmployee, employee_id)
-    if not existing_employee:
-        raise HTTPException(status_code=404, detail="Contractual Employee not found")
+    return await _update_employee(
+        ContractualEmployee.__table__,
+        "contractual",
+        schemas.ContractualEmployee,
+        employee_id,
+        updated_employee_data.model_dump(exclude_unset=True),
+        expected_version,
+        db,
+        "Contractual Employee not found",
+    )
 
-    for key, value in updated_employee_data.dict(exclude_unset=True).items():
-        setattr(existing_employee, key, value)
+async def _delete_employee(
+    table, type_of_employee: str, employee_id: UUID, db: AsyncSession, not_found_detail: str
+):
+    """Delete an employee in a single statement, detecting missing rows"""
+    query = delete(table).where(table.c.id == employee_id).returning(*table.c)
+    row = (await db.execute(query)).first()
+    if row is None:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail=not_found_detail)
 
+    await stats.record(db, removed=[(type_of_employee, row)])
     await db.commit()
-    await db.refresh(existing_employee)
-
-    return existing_employee
+    cache.bump_version()
+    await changes.broker.publish([_employee_event("deleted", type_of_employee, row)])
 
 async def delete_regular_employee(employee_id: UUID, db: AsyncSession):
     """Delete a regular employee by their ID (UUID)"""
-    existing_employee = await db.get(RegularEmployee, employee_id)
-    if not existing_employee:
-        raise HTTPException(status_code=404, detail="Regular Employee not found")
-
-    await db.delete(existing_employee)
-    await db.commit()
-
+    await _delete_employee(
+        RegularEmployee.__table__, "regular", employee_id, db, "Regular Employee not found"
+    )
     return {"detail": "Regular Employee deleted successfully"}
 
 async def delete_contractual_employee(employee_id: UUID, db: AsyncSession):
     """Delete a contractual employee by their ID (UUID)"""
-    existing_employee = await db.get(ContractualEmployee, employee_id)
-    if not existing_employee:
-        raise HTTPException(status_code=404, detail="Contractual Employee not found")
+    await _delete_employee(
+        ContractualEmployee.__table__,
+        "contractual",
+        employee_id,
+        db,
+        "Contractual Employee not found",
+    )
+    return {"detail": "Contractual Employee deleted successfully"}
+
+# Table and schemas used by the bulk operations for each type of employee
+EMPLOYEE_TYPES = {
+    "regular": (
+        RegularEmployee.__table__,
+        schemas.RegularEmployee,
+        schemas.RegularEmployeeCreate,
+        schemas.RegularEmployeeUpdate,
+    ),
+    "contractual": (
+        ContractualEmployee.__table__,
+        schemas.ContractualEmployee,
+        schemas.ContractualEmployeeCreate,
+        schemas.ContractualEmployeeUpdate,
+    ),
+}
+
+def _employee_event(kind: str, type_of_employee: str, row) -> dict:
+    """Build a change feed event from a written row; deletions carry only the ID"""
+    if kind == "deleted":
+        return changes.event(kind, type_of_employee, {"id": str(row.id)})
+    schema = EMPLOYEE_TYPES[type_of_employee][1]
+    employee = schema.model_validate(row, from_attributes=True).model_dump(mode="json")
+    return changes.event(kind, type_of_employee, employee)
+
+def _is_unique_violation(exc: IntegrityError) -> bool:
+    return getattr(exc.orig, "sqlstate", None) == "23505"
+
+async def bulk_create_employees(requests: list[schemas.EmployeeCreateRequest], db: AsyncSession):
+    """Create many employees in one transaction with one multi-row insert per table"""
+    results: list = [None] * len(requests)
+    pending = {type_of_employee: [] for type_of_employee in EMPLOYEE_TYPES}
+    written = []
+
+    for index, request in enumerate(requests):
+        if request.type_of_employee not in EMPLOYEE_TYPES:
+            results[index] = schemas.BulkItemResult(
+                index=index, status_code=400, detail="Invalid employee type"
+            )
+            continue
+
+        create_schema = EMPLOYEE_TYPES[request.type_of_employee][2]
+        try:
+            employee = create_schema(**request.employee.model_dump())
+        except ValidationError as exc:
+            results[index] = schemas.BulkItemResult(index=index, status_code=422, detail=str(exc))
+            continue
+        pending[request.type_of_employee].append((index, {"id": uuid.uuid4(), **employee.model_dump()}))
 
-    await db.delete(existing_employee)
+    for type_of_employee, items in pending.items():
+        if not items:
+            continue
+        table, schema = EMPLOYEE_TYPES[type_of_employee][:2]
+
+        # Rows whose email is already taken are skipped rather than aborting the batch
+        query = insert(table).on_conflict_do_nothing(index_elements=["email"]).returning(*table.c)
+        result = await db.execute(query, [values for _, values in items])
+        created = {row.id: row for row in result}
+
+        for index, values in items:
+            row = created.get(values["id"])
+            if row is None:
+                results[index] = schemas.BulkItemResult(
+                    index=index, status_code=409, detail="Email already exists"
+                )
+            else:
+                written.append((type_of_employee, row))
+                results[index] = schemas.BulkItemResult(
+                    index=index,
+                    status_code=201,
+                    employee=schema.model_validate(row, from_attributes=True),
+                )
+
+    await stats.record(db, added=written)
     await db.commit()
+    cache.bump_version()
+    await changes.broker.publish([_employee_event("created", *item) for item in written])
+    return results
 
-    return {"detail": "Contractual Employee deleted successfully"}
+async def _create_batch(type_of_employee: str, employees: list) -> list:
+    """Insert a batch of coalesced creates in one transaction, one result per employee"""
+    table, schema = EMPLOYEE_TYPES[type_of_employee][:2]
+    values = [{"id": uuid.uuid4(), **employee.model_dump()} for employee in employees]
+
+    async with local_session() as db:
+        query = insert(table).on_conflict_do_nothing(index_elements=["email"]).returning(*table.c)
+        created = {row.id: row for row in await db.execute(query, values)}
+        rows = [created.get(item["id"]) for item in values]
+        written = [(type_of_employee, row) for row in rows if row is not None]
+        await stats.record(db, added=written)
+        await db.commit()
+
+    cache.bump_version()
+    await changes.broker.publish([_employee_event("created", *item) for item in written])
+
+    return [
+        schema.model_validate(row, from_attributes=True) if row is not None
+        else HTTPException(status_code=409, detail="Email already exists")
+        for row in rows
+    ]
+
+# Concurrent single creates share one multi-row insert and commit per window
+create_coalescer = Coalescer(
+    _create_batch,
+    window=settings.EMPLOYEE_CREATE_COALESCE_WINDOW_MS / 1000,
+    max_batch=settings.EMPLOYEE_CREATE_COALESCE_MAX_BATCH,
+)
+
+def _bulk_update_statement(table, columns: tuple, items: list[tuple[UUID, dict]]):
+    """Build one UPDATE ... FROM (VALUES ...) RETURNING that sets `columns` on every listed row"""
+    changes = values(
+        column("id", table.c.id.type),
+        *(column(name, table.c[name].type) for name in columns),
+        name="changes",
+    ).data([(employee_id, *(row[name] for name in columns)) for employee_id, row in items])
+    assignments = {name: changes.c[name] for name in columns}
+    assignments["version"] = table.c.version + 1
+    return update(table).where(table.c.id == changes.c.id).values(assignments).returning(*table.c)
+
+async def _apply_bulk_update(
+    table, schema, columns: tuple, group: list, current: dict, results: list, db: AsyncSession
+):
+    """Run one multi-row UPDATE for a group, falling back to single rows to pin down a conflict"""
+    query = _bulk_update_statement(table, columns, [(request.id, row) for _, request, row in group])
+    try:
+        async with db.begin_nested():
+            updated = {row.id: row for row in await db.execute(query)}
+    except IntegrityError as exc:
+        if len(group) > 1:
+            for item in group:
+                await _apply_bulk_update(table, schema, columns, [item], current, results, db)
+            return
+        index = group[0][0]
+        detail = "Email already exists" if _is_unique_violation(exc) else "Invalid employee data"
+        status_code = 409 if _is_unique_violation(exc) else 422
+        results[index] = schemas.BulkItemResult(index=index, status_code=status_code, detail=detail)
+        return
+
+    for index, request, _ in group:
+        row = current[request.id] = updated[request.id]
+        results[index] = schemas.BulkItemResult(
+            index=index, status_code=200, employee=schema.model_validate(row, from_attributes=True)
+        )
+
+async def _bulk_update_table(type_of_employee: str, items: list, results: list, db: AsyncSession):
+    """Update one table's share of a bulk request, returning (type, old row, new row) per changed employee"""
+    table, schema = EMPLOYEE_TYPES[type_of_employee][:2]
+    # Locking in id order means overlapping bulk calls wait on each other rather than deadlock
+    locked = await db.execute(
+        select(table)
+        .where(table.c.id.in_({request.id for _, request, _ in items}))
+        .order_by(table.c.id)
+        .with_for_update()
+    )
+    current = {row.id: row for row in locked}
+    originals = dict(current)
+
+    # An ID repeated in one request is updated again in a later round, in request order
+    rounds: list[list] = []
+    occurrences: Counter = Counter()
+    for item in items:
+        round_number = occurrences[item[1].id]
+        occurrences[item[1].id] += 1
+        if round_number == len(rounds):
+            rounds.append([])
+        rounds[round_number].append(item)
+
+    for items_in_round in rounds:
+        groups = defaultdict(list)
+        for index, request, row in items_in_round:
+            employee = current.get(request.id)
+            if employee is None:
+                results[index] = schemas.BulkItemResult(
+                    index=index, status_code=404, detail="Employee not found"
+                )
+            elif request.version is not None and request.version != employee.version:
+                results[index] = schemas.BulkItemResult(
+                    index=index, status_code=409, detail="Employee was modified by another request"
+                )
+            else:
+                groups[tuple(sorted(row))].append((index, request, row))
+
+        for columns, group in groups.items():
+            await _apply_bulk_update(table, schema, columns, group, current, results, db)
+
+    return [
+        (type_of_employee, original, current[employee_id])
+        for employee_id, original in originals.items()
+        if current[employee_id] is not original
+    ]
+
+async def bulk_update_employees(requests: list[schemas.EmployeeBulkUpdateItem], db: AsyncSession):
+    """Update many employees in one transaction, with one UPDATE per table and set of columns"""
+    results: list = [None] * len(requests)
+    pending = {type_of_employee: [] for type_of_employee in EMPLOYEE_TYPES}
+
+    for index, request in enumerate(requests):
+        if request.type_of_employee not in EMPLOYEE_TYPES:
+            results[index] = schemas.BulkItemResult(
+                index=index, status_code=400, detail="Invalid employee type"
+            )
+            continue
+
+        update_schema = EMPLOYEE_TYPES[request.type_of_employee][3]
+        try:
+            updated_employee = update_schema(**request.employee.model_dump(exclude_unset=True))
+        except ValidationError as exc:
+            results[index] = schemas.BulkItemResult(index=index, status_code=422, detail=str(exc))
+            continue
+        pending[request.type_of_employee].append(
+            (index, request, updated_employee.model_dump(exclude_unset=True))
+        )
+
+    written = []
+    for type_of_employee, items in pending.items():
+        if items:
+            written += await _bulk_update_table(type_of_employee, items, results, db)
+
+    await stats.record(
+        db,
+        added=[(type_of_employee, new) for type_of_employee, _, new in written],
+        removed=[(type_of_employee, old) for type_of_employee, old, _ in written],
+    )
+    await db.commit()
+    cache.bump_version()
+    await changes.broker.publish(
+        [_employee_event("updated", type_of_employee, new) for type_of_employee, _, new in written]
+    )
+    return results
+
+async def bulk_delete_employees(requests: list[schemas.EmployeeBulkDeleteItem], db: AsyncSession):
+    """Delete many employees in one transaction with one statement per table"""
+    results: list = [None] * len(requests)
+    pending = {type_of_employee: [] for type_of_employee in EMPLOYEE_TYPES}
+
+    for index, request in enumerate(requests):
+        if request.type_of_employee not in EMPLOYEE_TYPES:
+            results[index] = schemas.BulkItemResult(
+                index=index, status_code=400, detail="Invalid employee type"
+            )
+        else:
+            pending[request.type_of_employee].append((index, request.id))
+    written = []
+
+    for type_of_employee, items in pending.items():
+        if not items:
+            continue
+        table = EMPLOYEE_TYPES[type_of_employee][0]
+
+        # Lock in id order, as bulk updates do, so the two can't deadlock each other
+        locked = (
+            select(table.c.id)
+            .where(table.c.id.in_([employee_id for _, employee_id in items]))
+            .order_by(table.c.id)
+            .with_for_update()
+        )
+        query = delete(table).where(table.c.id.in_(locked))
+        result = await db.execute(query.returning(*table.c))
+        deleted = {row.id: row for row in result}
+
+        for index, employee_id in items:
+            if employee_id in deleted:
+                # Repeated IDs in one request only count as deleted once
+                written.append((type_of_employee, deleted.pop(employee_id)))
+                results[index] = schemas.BulkItemResult(index=index, status_code=200)
+            else:
+                results[index] = schemas.BulkItemResult(
+                    index=index, status_code=404, detail="Employee not found"
+                )
+
+    await stats.record(db, removed=written)
+    await db.commit()
+    cache.bump_version()
+    await changes.broker.publish([_employee_event("deleted", *item) for item in written])
+    return results
+
+def _read_csv_chunk(reader: csv.DictReader, size: int):
+    """Read up to `size` rows, pairing each with the line it ended on"""
+    return [(reader.line_num, row) for row in islice(reader, size)]
+
+async def import_employees(
+    upload: BinaryIO,
+    db: AsyncSession,
+    report: Optional[Callable[[dict], Awaitable[None]]] = None,
+):
+    """Load employees from a CSV upload, validating and copying it in chunks"""
+    summary = schemas.ImportSummary()
+
+    def reject(line: int, detail: str):
+        summary.rejected += 1
+        if len(summary.errors) < settings.EMPLOYEE_IMPORT_MAX_REPORTED_ERRORS:
+            summary.errors.append(schemas.ImportRowError(line=line, detail=detail))
+
+    reader = csv.DictReader(io.TextIOWrapper(upload, encoding="utf-8-sig", newline=""))
+    while True:
+        try:
+            # The upload is spooled to a local file; parse it off the event loop
+            rows = await run_in_threadpool(
+                _read_csv_chunk, reader, settings.EMPLOYEE_IMPORT_CHUNK_SIZE
+            )
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid CSV file: {exc}") from exc
+        if not rows:
+            break
+
+        pending = {type_of_employee: [] for type_of_employee in EMPLOYEE_TYPES}
+        written = []
+        for line, row in rows:
+            type_of_employee = row.get("type_of_employee")
+            if type_of_employee not in EMPLOYEE_TYPES:
+                reject(line, "Invalid employee type")
+                continue
+
+            create_schema = EMPLOYEE_TYPES[type_of_employee][2]
+            try:
+                employee = create_schema.model_validate(row)
+            except ValidationError as exc:
+                reject(line, str(exc))
+                continue
+            pending[type_of_employee].append((line, uuid.uuid4(), employee))
+
+        for type_of_employee, items in pending.items():
+            if not items:
+                continue
+            table = EMPLOYEE_TYPES[type_of_employee][0]
+            columns = ["id", *EMPLOYEE_TYPES[type_of_employee][2].model_fields]
+
+            records = [
+                (employee_id, *employee.model_dump().values()) for _, employee_id, employee in items
+            ]
+            inserted = await _copy_employees(db, table, columns, records)
+
+            summary.accepted += len(inserted)
+            written.extend((type_of_employee, row) for row in inserted.values())
+            for line, employee_id, _ in items:
+                if employee_id not in inserted:
+                    reject(line, "Email already exists")
+
+        await stats.record(db, added=written)
+        await db.commit()
+        cache.bump_version()
+        await changes.broker.publish([_employee_event("created", *item) for item in written])
+        if report:
+            await report(summary.model_dump(exclude={"errors"}))
+
+    return summary
+
+async def spool_upload(upload: BinaryIO) -> str:
+    """Copy an upload to a file that outlives the request, returning its path"""
+    def copy() -> str:
+        os.makedirs(settings.JOB_RESULT_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=settings.JOB_RESULT_DIR, suffix=".csv", delete=False
+        ) as spool:
+            shutil.copyfileobj(upload, spool)
+        return spool.name
+
+    return await run_in_threadpool(copy)
+
+async def import_employees_job(path: str, report: Callable[[dict], Awaitable[None]]):
+    """Import a spooled CSV file in its own session, removing the file afterwards"""
+    try:
+        with open(path, "rb") as upload:
+            async with local_session() as db:
+                summary = await import_employees(upload, db, report)
+    finally:
+        os.remove(path)
+    return summary.model_dump(mode="json")
+
+async def _copy_employees(db: AsyncSession, table, columns: list[str], records: list[tuple]):
+    """COPY records into a staging table, then move the ones with unused emails into `table`"""
+    staging = f"{table.name}_import"
+    column_list = ", ".join(columns)
+    await db.execute(text(
+        f"CREATE TEMP TABLE {staging} (LIKE {table.name} INCLUDING DEFAULTS) ON COMMIT DROP"
+    ))
+
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        staging, records=records, columns=columns
+    )
+
+    result = await db.execute(text(
+        f"INSERT INTO {table.name} ({column_list}) SELECT {column_list} FROM {staging} "
+        "ON CONFLICT (email) DO NOTHING RETURNING *"
+    ))
+    return {row.id: row for row in result}
@@ -0,0 +1,164 @@
+"""Workforce statistics, kept in a summary table that each employee write adjusts"""
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import date, datetime, timezone
+from sqlalchemy import delete, extract, func, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio.session import AsyncSession
+from app.config import settings
+from app.database import local_session
+from app.employees import schemas
+from app.employees.models import ContractualEmployee, RegularEmployee, WorkforceStat
+
+logger = logging.getLogger(__name__)
+
+# Columns each type of employee contributes to the statistics
+STAT_COLUMNS = {
+    "regular": ("number_of_leaves",),
+    "contractual": ("project", "contract_end_date"),
+}
+
+# Stored as a total like the others, in seconds since the epoch
+RECONCILED_AT = ("reconciled_at", "")
+
+def _upsert(db: AsyncSession):
+    # The benchmarks can also run the API against SQLite
+    dialect = sqlite if db.get_bind().dialect.name == "sqlite" else postgresql
+    return dialect.insert(WorkforceStat)
+
+def _month(value: date) -> str:
+    return f"{value.year:04d}-{value.month:02d}"
+
+def _deltas(deltas: Counter, type_of_employee: str, row, sign: int, prefix: str = ""):
+    deltas["headcount", type_of_employee] += sign
+    if type_of_employee == "regular":
+        deltas["leaves", ""] += sign * getattr(row, f"{prefix}number_of_leaves")
+    else:
+        deltas["project", getattr(row, f"{prefix}project")] += sign
+        deltas["expiring", _month(getattr(row, f"{prefix}contract_end_date"))] += sign
+
+async def record(db: AsyncSession, added=(), removed=(), replaced=()):
+    """Adjust the totals for employees written in `db`'s transaction; call it right before commit.
+
+    Each argument lists (type_of_employee, row) pairs. Rows in `replaced`
+    carry their previous values as `old_`-prefixed attributes. The totals
+    commit or roll back together with the write, so every server process
+    reads the same numbers.
+    """
+    deltas: Counter = Counter()
+    for type_of_employee, row in added:
+        _deltas(deltas, type_of_employee, row, 1)
+    for type_of_employee, row in removed:
+        _deltas(deltas, type_of_employee, row, -1)
+    for type_of_employee, row in replaced:
+        _deltas(deltas, type_of_employee, row, -1, prefix="old_")
+        _deltas(deltas, type_of_employee, row, 1)
+
+    # Sorted so that concurrent writes lock the summary rows in the same order
+    rows = [
+        {"metric": metric, "key": key, "value": value}
+        for (metric, key), value in sorted(deltas.items())
+        if value
+    ]
+    if not rows:
+        return
+    statement = _upsert(db).values(rows)
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[WorkforceStat.metric, WorkforceStat.key],
+        set_={"value": WorkforceStat.value + statement.excluded.value},
+    ))
+
+async def reconcile(force: bool = True) -> bool:
+    """Recompute every total from the employee tables, returning whether it ran.
+
+    Writes wait on the summary table's lock while this runs, so the totals
+    match the tables exactly. Unless `force` is set, a reconcile done by any
+    process within the last half interval is left to stand.
+    """
+    contractual = ContractualEmployee.__table__
+    year = extract("year", contractual.c.contract_end_date)
+    month = extract("month", contractual.c.contract_end_date)
+
+    async with local_session() as db:
+        if db.get_bind().dialect.name != "sqlite":
+            # SQLite already runs one write transaction at a time
+            await db.execute(text(
+                f"LOCK TABLE {WorkforceStat.__tablename__} IN SHARE ROW EXCLUSIVE MODE"
+            ))
+        if not force:
+            reconciled_at = await db.get(WorkforceStat, RECONCILED_AT)
+            fresh_for = settings.EMPLOYEE_STATS_RECONCILE_SECONDS / 2
+            if reconciled_at and time.time() - reconciled_at.value < fresh_for:
+                await db.rollback()
+                return False
+
+        regular_count, total_leaves = (await db.execute(select(
+            func.count(), func.coalesce(func.sum(RegularEmployee.__table__.c.number_of_leaves), 0)
+        ))).one()
+        projects = (await db.execute(
+            select(contractual.c.project, func.count()).group_by(contractual.c.project)
+        )).all()
+        months = (await db.execute(
+            select(year, month, func.count()).group_by(year, month)
+        )).all()
+
+        totals = {
+            ("headcount", "regular"): regular_count,
+            ("headcount", "contractual"): sum(count for _, count in projects),
+            ("leaves", ""): int(total_leaves),
+            RECONCILED_AT: int(time.time()),
+            **{("project", project): count for project, count in projects},
+            **{("expiring", f"{int(y):04d}-{int(m):02d}"): count for y, m, count in months},
+        }
+        await db.execute(delete(WorkforceStat))
+        await db.execute(
+            insert(WorkforceStat),
+            [{"metric": metric, "key": key, "value": value} for (metric, key), value in totals.items()],
+        )
+        await db.commit()
+    return True
+
+async def snapshot() -> schemas.WorkforceStats:
+    """Return the current totals, reconciling first if they were never computed"""
+    async with local_session() as db:
+        # Read from the primary so that consecutive calls never go back in time
+        result = await db.execute(
+            select(WorkforceStat.metric, WorkforceStat.key, WorkforceStat.value)
+        )
+        totals = {(metric, key): value for metric, key, value in result}
+    if RECONCILED_AT not in totals:
+        await reconcile(force=False)
+        return await snapshot()
+
+    def by_key(metric: str) -> dict[str, int]:
+        return {
+            key: value for (name, key), value in sorted(totals.items()) if name == metric and value
+        }
+
+    headcount = by_key("headcount")
+    total_leaves = totals.get(("leaves", ""), 0)
+    regular = headcount.get("regular", 0)
+    return schemas.WorkforceStats(
+        headcount=headcount,
+        headcount_by_project=by_key("project"),
+        total_leaves=total_leaves,
+        average_leaves=total_leaves / regular if regular else None,
+        contracts_expiring_by_month=by_key("expiring"),
+        reconciled_at=datetime.fromtimestamp(totals[RECONCILED_AT], timezone.utc),
+    )
+
+async def reconcile_job(report) -> dict:
+    """Reconcile the statistics as a background job, returning the new totals"""
+    await reconcile()
+    return (await snapshot()).model_dump(mode="json")
+
+async def run_reconciler():
+    """Reconcile the statistics on startup and then periodically, until cancelled"""
+    while True:
+        try:
+            await reconcile(force=False)
+        except Exception:
+            logger.exception("Workforce statistics reconcile failed")
+        await asyncio.sleep(settings.EMPLOYEE_STATS_RECONCILE_SECONDS)
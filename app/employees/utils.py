@@ -0,0 +1,50 @@
+"""Utility functions for pagination cursors and sparse fieldsets."""
+import base64
+import json
+from datetime import date
+from typing import Iterable, Optional
+from uuid import UUID
+from fastapi import HTTPException
+
+def _encode(payload: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+def _decode(cursor: str) -> dict:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded))
+
+def encode_cursor(last_id: UUID) -> str:
+    """Encode the ID of the last row of a page into an opaque cursor."""
+    return _encode({"id": str(last_id)})
+
+def decode_cursor(cursor: str) -> UUID:
+    """Decode an opaque cursor back into the ID it was built from."""
+    try:
+        return UUID(_decode(cursor)["id"])
+    except (ValueError, TypeError, KeyError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+def encode_date_cursor(last_date: date, last_id: UUID) -> str:
+    """Encode the date and ID of the last row of a date-ordered page into a cursor."""
+    return _encode({"date": last_date.isoformat(), "id": str(last_id)})
+
+def decode_date_cursor(cursor: str) -> tuple[date, UUID]:
+    """Decode a date-ordered page cursor back into its date and ID."""
+    try:
+        payload = _decode(cursor)
+        return date.fromisoformat(payload["date"]), UUID(payload["id"])
+    except (ValueError, TypeError, KeyError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[list[str]]:
+    """Parse a comma-separated `fields` parameter into the columns to select."""
+    if not fields:
+        return None
+
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = sorted(set(requested) - set(allowed))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    # The ID is always selected since cursors are built from it
+    return list(dict.fromkeys(["id", *requested]))
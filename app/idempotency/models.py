@@ -0,0 +1,18 @@
+"""
+This module contains SQLAlchemy models for stored idempotent responses.
+"""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import DateTime, Index, LargeBinary
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (Index("ix_idempotency_keys_expires_at", "expires_at"),)
+
+    key: Mapped[str] = mapped_column(primary_key=True)  # Hash of user, method, path and key
+    fingerprint: Mapped[str] = mapped_column()
+    status_code: Mapped[Optional[int]] = mapped_column()  # None while the request is in flight
+    body: Mapped[Optional[bytes]] = mapped_column(LargeBinary)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
@@ -0,0 +1,234 @@
+"""Idempotency keys: the first response to a write is stored and replayed to its retries"""
+import asyncio
+import hashlib
+import logging
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Optional, Protocol
+import orjson
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from app.cache import TTLCache
+from app.config import settings
+from app.database import local_session
+from app.idempotency.models import IdempotencyKey
+from app.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+class IdempotencyStore(Protocol):
+    """Storage for responses by idempotency key, with a placeholder while the first request runs."""
+
+    async def start(self): ...
+    async def stop(self): ...
+
+    async def claim(self, key: str, fingerprint: str) -> Optional[dict]:
+        """Reserve a key for a new request and return None, or return the record already held.
+
+        A record is a dict of `fingerprint`, `status_code` and `body`, where a
+        `status_code` of None means the first request is still in flight.
+        """
+        ...
+
+    async def complete(self, key: str, fingerprint: str, status_code: int, body: bytes): ...
+    async def release(self, key: str): ...
+
+class MemoryIdempotencyStore:
+    """Responses kept in this process, evicting the least recently used over `max_size`.
+
+    Retries only replay when they reach the process that served the first
+    request; use the database store when running several workers.
+    """
+
+    def __init__(self, max_size: int, ttl: float, lock_ttl: float):
+        self.lock_ttl = lock_ttl
+        self._records = TTLCache(max_size=max_size, ttl=ttl, name="idempotency")
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def claim(self, key: str, fingerprint: str) -> Optional[dict]:
+        record = self._records.get(key)
+        if record is None:
+            # Expires on its own if the request never completes or releases it
+            placeholder = {"fingerprint": fingerprint, "status_code": None, "body": None}
+            self._records.set(key, placeholder, ttl=self.lock_ttl)
+        return record
+
+    async def complete(self, key: str, fingerprint: str, status_code: int, body: bytes):
+        self._records.set(key, {"fingerprint": fingerprint, "status_code": status_code, "body": body})
+
+    async def release(self, key: str):
+        self._records.pop(key)
+
+class DatabaseIdempotencyStore:
+    """Responses kept in the idempotency_keys table, shared by every server process.
+
+    Expired rows are deleted every `purge_interval` seconds.
+    """
+
+    def __init__(self, ttl: float, lock_ttl: float, purge_interval: float):
+        self.ttl = timedelta(seconds=ttl)
+        self.lock_ttl = timedelta(seconds=lock_ttl)
+        self.purge_interval = purge_interval
+        self._purger: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._purger = asyncio.create_task(self._purge())
+
+    async def stop(self):
+        if self._purger:
+            self._purger.cancel()
+            await asyncio.gather(self._purger, return_exceptions=True)
+
+    async def claim(self, key: str, fingerprint: str) -> Optional[dict]:
+        # Takes over the row as well when the previous one has expired but not been purged yet
+        statement = insert(IdempotencyKey).values(
+            key=key, fingerprint=fingerprint, expires_at=func.now() + self.lock_ttl
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[IdempotencyKey.key],
+            set_={
+                "fingerprint": statement.excluded.fingerprint,
+                "status_code": None,
+                "body": None,
+                "expires_at": statement.excluded.expires_at,
+            },
+            where=IdempotencyKey.expires_at <= func.now(),
+        ).returning(IdempotencyKey.key)
+
+        async with local_session() as db:
+            claimed = (await db.execute(statement)).first()
+            await db.commit()
+            if claimed:
+                return None
+            result = await db.execute(
+                select(IdempotencyKey.fingerprint, IdempotencyKey.status_code, IdempotencyKey.body)
+                .where(IdempotencyKey.key == key)
+            )
+            row = result.first()
+        # The row can only be gone if it was purged in between, leaving the key free again
+        return row._asdict() if row else await self.claim(key, fingerprint)
+
+    async def complete(self, key: str, fingerprint: str, status_code: int, body: bytes):
+        async with local_session() as db:
+            await db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == key)
+                .values(status_code=status_code, body=body, expires_at=func.now() + self.ttl)
+            )
+            await db.commit()
+
+    async def release(self, key: str):
+        async with local_session() as db:
+            await db.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None)
+                )
+            )
+            await db.commit()
+
+    async def _purge(self):
+        while True:
+            try:
+                async with local_session() as db:
+                    result = await db.execute(
+                        delete(IdempotencyKey).where(IdempotencyKey.expires_at <= func.now())
+                    )
+                    await db.commit()
+                if result.rowcount:
+                    logger.info("Purged %d expired idempotency keys", result.rowcount)
+            except Exception:
+                logger.exception("Could not purge expired idempotency keys")
+            await asyncio.sleep(self.purge_interval)
+
+def _create_store() -> IdempotencyStore:
+    if settings.IDEMPOTENCY_STORE == "database":
+        return DatabaseIdempotencyStore(
+            settings.IDEMPOTENCY_KEY_TTL_SECONDS,
+            settings.IDEMPOTENCY_LOCK_SECONDS,
+            settings.IDEMPOTENCY_PURGE_SECONDS,
+        )
+    return MemoryIdempotencyStore(
+        settings.IDEMPOTENCY_CACHE_MAX_SIZE,
+        settings.IDEMPOTENCY_KEY_TTL_SECONDS,
+        settings.IDEMPOTENCY_LOCK_SECONDS,
+    )
+
+store = _create_store()
+
+def _hash(*parts: Any) -> str:
+    return hashlib.sha256(orjson.dumps(parts, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+def _response(status_code: int, body: bytes, replayed: bool = False) -> Response:
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    return Response(body, status_code=status_code, media_type="application/json", headers=headers)
+
+async def idempotent(
+    key: Optional[str],
+    scope: tuple,
+    payload: Any,
+    handler: Callable[[], Awaitable[Any]],
+) -> Any:
+    """Run a write once per idempotency key, replaying its stored response to retries.
+
+    `scope` (user, method and path) keeps keys from different callers and
+    endpoints apart, and `payload` is fingerprinted so a key reused for a
+    different request is rejected. Without a key the handler just runs.
+    Error responses from the handler are stored like any other, except 5xx
+    and unexpected exceptions, which free the key so a retry runs again.
+    """
+    if key is None:
+        return await handler()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters",
+        )
+
+    stored_key = _hash(*scope, key)
+    fingerprint = _hash(jsonable_encoder(payload))
+    record = await store.claim(stored_key, fingerprint)
+    if record is not None:
+        if record["fingerprint"] != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used for a different request",
+            )
+        if record["status_code"] is None:
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is still in progress",
+                headers={"Retry-After": "1"},
+            )
+        return _response(record["status_code"], record["body"], replayed=True)
+
+    try:
+        result = await handler()
+    except HTTPException as exc:
+        if exc.status_code >= 500:
+            await store.release(stored_key)
+            raise
+        await _complete(stored_key, fingerprint, exc.status_code, dumps({"detail": exc.detail}))
+        raise
+    except BaseException:
+        await store.release(stored_key)
+        raise
+
+    body = dumps(jsonable_encoder(result))
+    await _complete(stored_key, fingerprint, 200, body)
+    return _response(200, body)
+
+async def _complete(key: str, fingerprint: str, status_code: int, body: bytes):
+    try:
+        await store.complete(key, fingerprint, status_code, body)
+    except Exception:
+        # The write itself has committed; a retry will find the key in flight until it expires
+        logger.exception("Could not store the response for an idempotency key")
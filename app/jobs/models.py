@@ -0,0 +1,33 @@
+"""
+This module contains SQLAlchemy models for the background jobs.
+"""
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import JSON, DateTime, func
+from sqlalchemy.dialects.postgresql import UUID as SQLAlchemyUUID
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id: Mapped[SQLAlchemyUUID] = mapped_column(
+        SQLAlchemyUUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        unique=True,
+        nullable=False
+    )
+    kind: Mapped[str] = mapped_column()
+    status: Mapped[str] = mapped_column(default="queued")  # queued, running, succeeded or failed
+    progress: Mapped[Optional[dict]] = mapped_column(JSON)
+    result: Mapped[Optional[dict]] = mapped_column(JSON)
+    error: Mapped[Optional[str]] = mapped_column()
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now()
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    # Refreshed by the process holding the job; a stale one means that process is gone
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
@@ -0,0 +1,46 @@
+"""Job routes module"""
+import os
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.auth.utils import get_current_user
+from app.config import settings
+from app.database import get_db
+from app.jobs import schemas
+from app.jobs.models import Job
+from app.auth import schemas as auth_schemas
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+async def _get_job(job_id: UUID, db: AsyncSession) -> Job:
+    # Read from the primary; a lagging replica would report stale progress
+    job = await db.get(Job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/{job_id}", response_model=schemas.Job)
+async def read_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: auth_schemas.User = Depends(get_current_user)
+):
+    """Get the status, progress and result of a job"""
+    return await _get_job(job_id, db)
+
+@router.get("/{job_id}/result")
+async def read_job_result(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: auth_schemas.User = Depends(get_current_user)
+):
+    """Download the file produced by a finished job"""
+    job = await _get_job(job_id, db)
+    if job.status != "succeeded" or not (job.result or {}).get("file"):
+        raise HTTPException(status_code=409, detail="Job has no downloadable result")
+
+    path = os.path.join(settings.JOB_RESULT_DIR, job.result["file"])
+    if not os.path.exists(path):
+        raise HTTPException(status_code=410, detail="Job result is no longer available")
+    return FileResponse(path, media_type=job.result["media_type"], filename=job.result["filename"])
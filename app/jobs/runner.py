@@ -0,0 +1,174 @@
+"""Bounded in-process runner for long operations, with their status kept in the jobs table"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
+from fastapi import HTTPException
+from sqlalchemy import func, or_, update
+from app.config import settings
+from app.database import local_session
+from app.jobs.models import Job
+
+logger = logging.getLogger(__name__)
+
+Report = Callable[[dict], Awaitable[None]]
+# A job receives a callback for reporting progress and returns its result
+JobFunc = Callable[[Report], Awaitable[Optional[dict]]]
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+async def _update_job(job_id: UUID, **values):
+    # Each update commits on its own so pollers see progress as it happens
+    async with local_session() as db:
+        await db.execute(update(Job).where(Job.id == job_id).values(**values))
+        await db.commit()
+
+def _remove_old_results(max_age: float) -> int:
+    """Delete result files and spooled uploads under JOB_RESULT_DIR older than `max_age` seconds"""
+    if not os.path.isdir(settings.JOB_RESULT_DIR):
+        return 0
+    removed = 0
+    cutoff = time.time() - max_age
+    with os.scandir(settings.JOB_RESULT_DIR) as entries:
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                # Another server process removed it first
+                pass
+    return removed
+
+class JobRunner:
+    """Runs submitted jobs on a fixed number of worker tasks in this process.
+
+    Jobs run in the process that accepted them, but their status is stored
+    in the database so any server process can answer polls for it. The
+    runner keeps a heartbeat on its unfinished jobs, fails jobs whose
+    process stopped without finishing them, and deletes old result files.
+    """
+
+    def __init__(self, workers: int, max_queued: int, heartbeat: float, retention: float):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.heartbeat = heartbeat
+        self.retention = retention
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+        self._unfinished: set[UUID] = set()
+
+    def start(self):
+        """Start the worker and maintenance tasks; called from the application lifespan."""
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._maintain()))
+
+    async def stop(self):
+        """Cancel the workers and mark jobs they did not finish as failed."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        for job_id in self._unfinished:
+            await _update_job(
+                job_id, status="failed", error="Interrupted by server shutdown", finished_at=_now()
+            )
+        self._unfinished.clear()
+
+    async def submit(self, kind: str, func: JobFunc) -> Job:
+        """Record a queued job and hand it to the workers, or 503 if too many are waiting."""
+        if len(self._unfinished) >= self.max_queued:
+            raise HTTPException(
+                status_code=503, detail="Too many pending jobs", headers={"Retry-After": "5"}
+            )
+
+        job = Job(kind=kind, status="queued", heartbeat_at=_now())
+        async with local_session() as db:
+            db.add(job)
+            await db.commit()
+
+        self._unfinished.add(job.id)
+        self._queue.put_nowait((job.id, func))
+        return job
+
+    async def _maintain(self):
+        """Every `heartbeat` seconds, refresh this process's jobs, fail orphaned ones and prune files"""
+        while True:
+            try:
+                await self._beat()
+                await self._fail_orphaned_jobs()
+                removed = await asyncio.to_thread(_remove_old_results, self.retention)
+                if removed:
+                    logger.info("Removed %d expired job result files", removed)
+            except Exception:
+                logger.exception("Job maintenance failed")
+            await asyncio.sleep(self.heartbeat)
+
+    async def _beat(self):
+        if self._unfinished:
+            async with local_session() as db:
+                await db.execute(
+                    update(Job).where(Job.id.in_(self._unfinished)).values(heartbeat_at=func.now())
+                )
+                await db.commit()
+
+    async def _fail_orphaned_jobs(self):
+        # Missing a few heartbeats in a row means the process holding the job has gone away
+        stale = func.now() - timedelta(seconds=3 * self.heartbeat)
+        async with local_session() as db:
+            result = await db.execute(
+                update(Job)
+                .where(
+                    Job.status.in_(("queued", "running")),
+                    or_(Job.heartbeat_at.is_(None), Job.heartbeat_at < stale),
+                )
+                .values(
+                    status="failed",
+                    error="Abandoned by a server process that stopped",
+                    finished_at=func.now(),
+                )
+            )
+            await db.commit()
+        if result.rowcount:
+            logger.warning("Marked %d orphaned jobs as failed", result.rowcount)
+
+    async def _work(self):
+        while True:
+            job_id, func = await self._queue.get()
+            try:
+                await self._run(job_id, func)
+            except Exception:
+                # Losing the status update must not take the worker down with it
+                logger.exception("Could not record the outcome of job %s", job_id)
+            self._unfinished.discard(job_id)
+
+    async def _run(self, job_id: UUID, func: JobFunc):
+        await _update_job(job_id, status="running", started_at=_now())
+
+        async def report(progress: dict):
+            await _update_job(job_id, progress=progress)
+
+        try:
+            result = await func(report)
+        except HTTPException as exc:
+            # Rejected input, e.g. an unreadable upload, rather than a failure of the job itself
+            await _update_job(job_id, status="failed", error=str(exc.detail), finished_at=_now())
+        except Exception as exc:
+            logger.exception("Job %s failed", job_id)
+            # The message can hold SQL and parameters; clients only see the type, the log has the rest
+            error = f"Internal error: {type(exc).__name__}"
+            await _update_job(job_id, status="failed", error=error, finished_at=_now())
+        else:
+            await _update_job(job_id, status="succeeded", result=result, finished_at=_now())
+
+runner = JobRunner(
+    workers=settings.JOB_WORKERS,
+    max_queued=settings.JOB_MAX_QUEUED,
+    heartbeat=settings.JOB_HEARTBEAT_SECONDS,
+    retention=settings.JOB_RESULT_RETENTION_HOURS * 3600,
+)
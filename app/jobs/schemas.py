@@ -0,0 +1,20 @@
+"""
+This module contains the Pydantic models
+for the Job class
+"""
+from uuid import UUID
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, ConfigDict
+
+class Job(BaseModel):
+    id: UUID
+    kind: str
+    status: str
+    progress: Optional[dict] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    model_config = ConfigDict(from_attributes=True)
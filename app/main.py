@@ -1,9 +1,35 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
-from app.auth import router as auth_routes
-from app.employees import router as employees_routes
+from fastapi.responses import Response
+from app import database, metrics
+from app.auth import hashing, router as auth_routes
+from app.employees import changes, router as employees_routes, stats
+from app.idempotency.store import store as idempotency_store
+from app.jobs import router as jobs_routes
+from app.jobs.runner import runner
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await database.warm_pools()
+    reconciler = asyncio.create_task(stats.run_reconciler())
+    replica_monitor = asyncio.create_task(database.monitor_replicas())
+    await changes.broker.start()
+    await idempotency_store.start()
+    runner.start()
+    yield
+    await runner.stop()
+    await idempotency_store.stop()
+    await changes.broker.stop()
+    for task in (reconciler, replica_monitor):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await database.dispose_engines()
+    hashing.shutdown_executor()
+
+app = FastAPI(lifespan=lifespan)
 
 origins = [
     "http://localhost:5173"
@@ -17,10 +43,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(database.ReadYourWritesMiddleware)
+
+app.add_middleware(metrics.MetricsMiddleware)
+
 @app.get("/")
 def read_root():
     """Root API"""
     return { "message": "API for Sprout Exam" }
 
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    """Prometheus metrics"""
+    content, content_type = metrics.render_latest()
+    return Response(content=content, media_type=content_type)
+
 app.include_router(auth_routes.router)
 app.include_router(employees_routes.router)
+app.include_router(jobs_routes.router)
@@ -0,0 +1,139 @@
+"""Prometheus metrics for HTTP requests, database queries and the connection pool"""
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter as PrometheusCounter, Histogram, REGISTRY,
+    generate_latest, multiprocess
+)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method, route template and status code",
+    ["method", "route", "status"],
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries issued per HTTP request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16, 32, 64),
+)
+REQUEST_QUERY_TIME = Histogram(
+    "http_request_db_query_seconds",
+    "Total database query time per HTTP request",
+    ["method", "route"],
+)
+QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "Latency of individual database queries",
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+CACHE_REQUESTS = PrometheusCounter(
+    "cache_requests",
+    "In-process cache lookups by cache and result (hit or miss)",
+    ["cache", "result"],
+)
+
+class RequestStats:
+    """Database activity attributed to the request being served"""
+
+    __slots__ = ("scope", "queries", "query_time", "statements")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.queries = 0
+        self.query_time = 0.0
+        self.statements: Counter = Counter()
+
+    @property
+    def route(self) -> str:
+        """The matched route template, once routing has happened"""
+        return getattr(self.scope.get("route"), "path", "unmatched")
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records how long each checkout waits"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+    QUERY_LATENCY.observe(elapsed)
+
+    stats = request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_time += elapsed
+
+def _handle_error(exception_context):
+    started = exception_context.connection and exception_context.connection.info.get("query_started_at")
+    if started:
+        started.pop()
+
+def instrument_engine(engine: AsyncEngine):
+    """Time every query run on an engine"""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency and per-request database usage"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = request_stats.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Label by route template so that IDs in paths don't explode cardinality
+            route = stats.route
+            REQUEST_LATENCY.labels(scope["method"], route, str(status_code)).observe(
+                time.perf_counter() - started
+            )
+            REQUEST_QUERIES.labels(scope["method"], route).observe(stats.queries)
+            REQUEST_QUERY_TIME.labels(scope["method"], route).observe(stats.query_time)
+            request_stats.reset(token)
+
+def render_latest() -> tuple[bytes, str]:
+    """Render every metric in the Prometheus text format"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # Aggregate the samples written by every worker process
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
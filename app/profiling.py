@@ -0,0 +1,80 @@
+"""Sampled slow-query logging and repeated-query detection"""
+import json
+import logging
+import random
+import time
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.config import settings
+from app.metrics import request_stats
+
+logger = logging.getLogger("app.queries")
+
+def _explain(conn, statement: str, parameters) -> list[str]:
+    """Fetch the plan of a statement through a raw cursor, bypassing engine events
+
+    The EXPLAIN runs in a savepoint, so if it fails the transaction of the
+    query it describes can still be used.
+    """
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT profiling_explain")
+        try:
+            cursor.execute(f"EXPLAIN {statement}", parameters)
+            plan = [row[0] for row in cursor.fetchall()]
+        except Exception:
+            cursor.execute("ROLLBACK TO SAVEPOINT profiling_explain")
+            raise
+        cursor.execute("RELEASE SAVEPOINT profiling_explain")
+        return plan
+    finally:
+        cursor.close()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profiling_started_at", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration_ms = (time.perf_counter() - conn.info["profiling_started_at"].pop()) * 1000
+    stats = request_stats.get()
+    route = stats.route if stats is not None else None
+
+    if stats is not None:
+        stats.statements[statement] += 1
+        if stats.statements[statement] == settings.REPEATED_QUERY_THRESHOLD:
+            logger.warning(json.dumps({
+                "event": "repeated_query",
+                "route": route,
+                "count": settings.REPEATED_QUERY_THRESHOLD,
+                "statement": statement,
+            }))
+
+    is_slow = duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS
+    if not is_slow and random.random() >= settings.QUERY_LOG_SAMPLE_RATE:
+        return
+
+    record = {
+        "event": "slow_query" if is_slow else "sampled_query",
+        "route": route,
+        "duration_ms": round(duration_ms, 2),
+        "statement": statement,
+        "parameters": repr(parameters)[:1000],
+    }
+    if is_slow and settings.QUERY_LOG_EXPLAIN and not executemany:
+        if statement.lstrip().upper().startswith("SELECT"):
+            try:
+                record["plan"] = _explain(conn, statement, parameters)
+            except Exception as exc:
+                # The query itself succeeded; a plan that can't be fetched must not fail it
+                record["plan_error"] = f"{type(exc).__name__}: {exc}"[:1000]
+    logger.log(logging.WARNING if is_slow else logging.INFO, json.dumps(record))
+
+def _handle_error(exception_context):
+    started = exception_context.connection and exception_context.connection.info.get("profiling_started_at")
+    if started:
+        started.pop()
+
+def instrument_engine(engine: AsyncEngine):
+    """Profile every query run on an engine"""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
@@ -0,0 +1,18 @@
+"""Fast JSON encoding and the response class built on it"""
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+
+def dumps(content: Any) -> bytes:
+    """Encode content to JSON bytes with orjson.
+
+    orjson handles dates and standard UUIDs natively; anything else it does
+    not know, such as the UUID type asyncpg returns, is encoded as a string.
+    """
+    return orjson.dumps(content, default=str)
+
+class ORJSONResponse(JSONResponse):
+    """JSON response encoded with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,60 @@
+"""Production entry point running the API in several uvicorn worker processes"""
+import glob
+import logging
+import os
+import uvicorn
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+def _warn_about_per_process_state(workers: int):
+    """Point out settings whose default state is not shared across workers"""
+    if workers > 1 and settings.CHANGE_FEED_BROKER == "memory":
+        logger.warning(
+            "CHANGE_FEED_BROKER=memory with %d workers: change feed subscribers will miss "
+            "events written on other workers, and cached employee list pages stay stale "
+            "until they expire; set CHANGE_FEED_BROKER=postgres",
+            workers,
+        )
+    if workers > 1 and settings.IDEMPOTENCY_STORE == "memory":
+        logger.warning(
+            "IDEMPOTENCY_STORE=memory with %d workers: retries that reach another worker "
+            "are written again; set IDEMPOTENCY_STORE=database",
+            workers,
+        )
+
+def _clear_metrics_dir():
+    """Remove the Prometheus samples that the workers of a previous run left behind"""
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not path:
+        return
+    os.makedirs(path, exist_ok=True)
+    for sample_file in glob.glob(os.path.join(path, "*.db")):
+        os.remove(sample_file)
+
+def main():
+    """Serve the API with one worker per core unless WEB_CONCURRENCY says otherwise"""
+    # Each worker is a fresh process that imports the app, and with it creates
+    # its own engines and pools; nothing is shared across workers.
+    cores = os.cpu_count() or 1
+    workers = settings.WEB_CONCURRENCY or cores
+    if settings.PASSWORD_HASH_WORKERS is None:
+        # Split the cores between the workers' hashing pools instead of giving each one all of them
+        os.environ["PASSWORD_HASH_WORKERS"] = str(max(1, cores // workers))
+    _warn_about_per_process_state(workers)
+    # Before any worker starts, as workers write samples there as soon as they import the app
+    _clear_metrics_dir()
+    uvicorn.run(
+        "app.main:app",
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        proxy_headers=True,
+        # On SIGTERM workers stop accepting connections and finish in-flight requests
+        timeout_graceful_shutdown=settings.GRACEFUL_SHUTDOWN_SECONDS,
+    )
+
+if __name__ == "__main__":
+    main()
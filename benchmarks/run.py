@@ -0,0 +1,245 @@
+"""
+HTTP load benchmark for the API.
+
+Boots `app.main:app` in-process against the database in DATABASE_URL (or
+--database-url), seeds regular and contractual employees, then drives each
+route at a fixed concurrency and reports throughput and latency
+percentiles. Results are also written as JSON so that runs can be compared
+with --compare.
+
+    python -m benchmarks.run --database-url sqlite+aiosqlite:///bench.db --reset
+    python -m benchmarks.run --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+import uuid
+from datetime import date, timedelta
+
+ROUTES = ["login", "list", "get", "create", "update", "delete"]
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    parser.add_argument("--employees", type=int, default=1000, help="employees of each type to seed")
+    parser.add_argument("--requests", type=int, default=500, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--routes", default=",".join(ROUTES), help="comma-separated routes to run")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for payloads")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    return parser.parse_args()
+
+def percentile(latencies: list[float], fraction: float) -> float:
+    index = min(len(latencies) - 1, max(0, round(fraction * len(latencies)) - 1))
+    return latencies[index]
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    completed = len(latencies)
+    return {
+        "requests": completed + errors,
+        "errors": errors,
+        "throughput_rps": round(completed / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+    }
+
+async def drive(count: int, concurrency: int, send) -> dict:
+    """Call `send(i)` for i in range(count) from `concurrency` workers, timing each call"""
+    latencies: list[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal errors, next_index
+        while next_index < count:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            response = await send(index)
+            if response.status_code < 400:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+def regular_payload(rng: random.Random) -> dict:
+    suffix = uuid.uuid4().hex
+    return {
+        "first_name": f"Bench{suffix[:6]}",
+        "last_name": "Regular",
+        "email": f"regular-{suffix}@bench.local",
+        "number_of_leaves": rng.randint(0, 30),
+        "benefits": "HMO",
+    }
+
+def contractual_payload(rng: random.Random) -> dict:
+    suffix = uuid.uuid4().hex
+    return {
+        "first_name": f"Bench{suffix[:6]}",
+        "last_name": "Contractual",
+        "email": f"contractual-{suffix}@bench.local",
+        "contract_end_date": (date.today() + timedelta(days=rng.randint(1, 720))).isoformat(),
+        "project": f"Project {rng.randint(1, 20)}",
+    }
+
+async def prepare_database(args, rng: random.Random) -> tuple[list, list]:
+    """Optionally reset the schema, then seed employees directly through Core inserts"""
+    from sqlalchemy import insert
+    from app.base import Base
+    from app.database import async_engine
+    from app.employees.models import ContractualEmployee, RegularEmployee
+
+    async with async_engine.begin() as conn:
+        if args.reset:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+
+        regular = [{"id": uuid.uuid4(), **regular_payload(rng)} for _ in range(args.employees)]
+        contractual = [{"id": uuid.uuid4(), **contractual_payload(rng)} for _ in range(args.employees)]
+        contractual = [
+            {**row, "contract_end_date": date.fromisoformat(row["contract_end_date"])}
+            for row in contractual
+        ]
+        if regular:
+            await conn.execute(insert(RegularEmployee.__table__), regular)
+            await conn.execute(insert(ContractualEmployee.__table__), contractual)
+
+    return (
+        [("regular", row["id"]) for row in regular],
+        [("contractual", row["id"]) for row in contractual],
+    )
+
+async def run(args) -> dict:
+    import httpx
+    from app.main import app
+
+    rng = random.Random(args.seed)
+    regular, contractual = await prepare_database(args, rng)
+    seeded = regular + contractual
+    routes = [route for route in args.routes.split(",") if route]
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            credentials = {"username": f"bench-{uuid.uuid4().hex[:8]}", "password": "bench-password"}
+            await client.post("/api/auth/register", json=credentials)
+            response = await client.post("/api/auth/login", json=credentials)
+            response.raise_for_status()
+            client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+            created: list[tuple[str, str]] = []
+            results = {}
+
+            async def send_login(_):
+                return await client.post("/api/auth/login", json=credentials)
+
+            async def send_list(_):
+                return await client.get("/api/employees/", params={"limit": 50})
+
+            async def send_get(_):
+                _, employee_id = rng.choice(seeded)
+                return await client.get(f"/api/employees/{employee_id}")
+
+            async def send_create(index):
+                type_of_employee = "regular" if index % 2 == 0 else "contractual"
+                payload = regular_payload(rng) if index % 2 == 0 else contractual_payload(rng)
+                response = await client.post(
+                    "/api/employees/",
+                    json={"type_of_employee": type_of_employee, "employee": payload},
+                )
+                if response.status_code < 400:
+                    created.append((type_of_employee, response.json()["id"]))
+                return response
+
+            async def send_update(index):
+                pool = created or seeded
+                type_of_employee, employee_id = pool[index % len(pool)]
+                if type_of_employee == "regular":
+                    payload = regular_payload(rng)
+                else:
+                    payload = contractual_payload(rng)
+                return await client.put(
+                    f"/api/employees/{employee_id}",
+                    json={"type_of_employee": type_of_employee, "employee": payload},
+                )
+
+            async def send_delete(index):
+                pool = created if index < len(created) else seeded
+                type_of_employee, employee_id = pool[index % len(pool)]
+                return await client.delete(
+                    f"/api/employees/{employee_id}", params={"type_of_employee": type_of_employee}
+                )
+
+            senders = {
+                "login": send_login,
+                "list": send_list,
+                "get": send_get,
+                "create": send_create,
+                "update": send_update,
+                "delete": send_delete,
+            }
+            for route in routes:
+                results[route] = await drive(args.requests, args.concurrency, senders[route])
+                print(f"{route:<8} {json.dumps(results[route])}")
+
+    return {
+        "config": {
+            "database": args.database_url.split("://", 1)[0],
+            "employees": args.employees,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+def compare(current: dict, previous: dict):
+    print(f"\n{'route':<8} {'rps':>18} {'p50 ms':>18} {'p99 ms':>18}")
+    for route, result in current["results"].items():
+        before = previous["results"].get(route)
+        if not before:
+            continue
+        cells = []
+        for metric in ("throughput_rps", "p50_ms", "p99_ms"):
+            old, new = before.get(metric), result.get(metric)
+            change = f"{(new - old) / old * 100:+.1f}%" if old and new is not None else "n/a"
+            cells.append(f"{new} ({change})")
+        print(f"{route:<8} " + " ".join(f"{cell:>18}" for cell in cells))
+
+def main():
+    args = parse_args()
+    if not args.database_url:
+        raise SystemExit("Set DATABASE_URL or pass --database-url")
+
+    # Settings are read when the app is imported, so configure it first
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    # The login route measures hashing, so keep one client from being throttled
+    for name in ("LOGIN_THROTTLE_IP_BURST", "LOGIN_THROTTLE_USERNAME_BURST"):
+        os.environ.setdefault(name, str(10 * args.requests))
+
+    report = asyncio.run(run(args))
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=2)
+    print(f"\nWrote {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as previous:
+            compare(report, json.load(previous))
+
+if __name__ == "__main__":
+    main()
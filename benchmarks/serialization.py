@@ -0,0 +1,69 @@
+"""
+Serialization microbenchmark for employee list pages.
+
+Compares the old read path (validate every row into a Pydantic model, then
+dump the page) with the fast path used by the list routes (plain row dicts
+encoded straight to JSON bytes with orjson). No database is needed.
+
+    python -m benchmarks.serialization --rows 50000
+"""
+import argparse
+import os
+import time
+import uuid
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args()
+
+def make_rows(count: int) -> list[dict]:
+    return [
+        {
+            "id": uuid.uuid4(),
+            "first_name": f"First{index}",
+            "last_name": f"Last{index}",
+            "email": f"employee{index}@example.com",
+            "contract_end_date": date.today() + timedelta(days=index % 720),
+            "project": f"Project {index % 20}",
+            "version": 1,
+        }
+        for index in range(count)
+    ]
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main():
+    args = parse_args()
+    os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    from app.employees import schemas
+    from app.responses import dumps
+
+    rows = make_rows(args.rows)
+    orm_like = [SimpleNamespace(**row) for row in rows]
+
+    def pydantic_path():
+        items = [schemas.ContractualEmployee.model_validate(row) for row in orm_like]
+        return schemas.ContractualEmployeePage(items=items).model_dump_json().encode()
+
+    def fast_path():
+        return dumps({"items": rows, "next_cursor": None})
+
+    for name, func in (("pydantic", pydantic_path), ("orjson", fast_path)):
+        elapsed = best_of(args.repeat, func)
+        print(f"{name:<9} {args.rows / elapsed:>12,.0f} rows/s  ({elapsed * 1000:.1f} ms per page)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Helpers for migrations that must not block writes on large tables.
+
+    from migrations.helpers import backfill, create_index_concurrently
+
+Index builds run outside the migration transaction with CONCURRENTLY, and
+backfills update rows in small committed batches that record a checkpoint,
+so an interrupted upgrade resumes where it stopped when it is run again.
+"""
+import logging
+import time
+from typing import Optional, Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+logger = logging.getLogger("alembic.runtime.helpers")
+
+CHECKPOINTS_TABLE = "migration_checkpoints"
+
+
+def set_lock_timeout(timeout: str = "5s") -> None:
+    """Fail fast instead of queueing writes behind DDL that is waiting for a lock.
+
+    Applies to the rest of the migration transaction, e.g. before `op.add_column`.
+    """
+    op.execute(f"SET LOCAL lock_timeout = '{timeout}'")
+
+
+def _index_is_invalid(name: str) -> bool:
+    # A failed CONCURRENTLY build leaves an invalid index behind that IF NOT EXISTS would keep
+    result = op.get_bind().execute(
+        sa.text(
+            "SELECT NOT indisvalid FROM pg_index "
+            "WHERE indexrelid = to_regclass(:name)"
+        ),
+        {"name": name},
+    )
+    return bool(result.scalar())
+
+
+def create_index_concurrently(name: str, table: str, columns: Sequence[str], **kw) -> None:
+    """Build an index with CREATE INDEX CONCURRENTLY, which does not block writes."""
+    with op.get_context().autocommit_block():
+        if _index_is_invalid(name):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+        op.create_index(
+            name, table, list(columns), postgresql_concurrently=True, if_not_exists=True, **kw
+        )
+
+
+def drop_index_concurrently(name: str, table: str, **kw) -> None:
+    """Drop an index with DROP INDEX CONCURRENTLY, which does not block writes."""
+    with op.get_context().autocommit_block():
+        op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True, **kw)
+
+
+def _estimated_rows(table: str) -> Optional[int]:
+    result = op.get_bind().execute(
+        sa.text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": table},
+    )
+    estimate = result.scalar()
+    return estimate if estimate and estimate > 0 else None
+
+
+def backfill(
+    name: str,
+    table: str,
+    assignments: str,
+    where: str = "TRUE",
+    batch_size: int = 1000,
+    pause: float = 0.1,
+    key: str = "id",
+) -> int:
+    """Run `UPDATE table SET assignments WHERE where` in committed batches, in key order.
+
+    Each batch commits together with a checkpoint under `name`, so if the
+    migration is interrupted, running it again skips rows already done. The
+    checkpoint is removed once the backfill completes. `pause` seconds are
+    slept between batches to leave room for other writes. Returns the number
+    of rows updated by this run.
+    """
+    statement = sa.text(f"""
+        WITH batch AS (
+            SELECT {key} FROM {table}
+            WHERE ({where}) AND (:last_key IS NULL OR {key} > :last_key)
+            ORDER BY {key}
+            LIMIT :batch_size
+        ), updated AS (
+            UPDATE {table} AS target SET {assignments}
+            FROM batch WHERE target.{key} = batch.{key}
+            RETURNING target.{key}
+        )
+        INSERT INTO {CHECKPOINTS_TABLE} (name, last_key, rows_done)
+        SELECT :name, (SELECT {key} FROM batch ORDER BY {key} DESC LIMIT 1)::text, count(*)
+        FROM updated
+        HAVING count(*) > 0
+        ON CONFLICT (name) DO UPDATE SET
+            last_key = EXCLUDED.last_key,
+            rows_done = {CHECKPOINTS_TABLE}.rows_done + EXCLUDED.rows_done,
+            updated_at = now()
+        RETURNING last_key, rows_done
+    """)
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        bind.execute(sa.text(f"""
+            CREATE TABLE IF NOT EXISTS {CHECKPOINTS_TABLE} (
+                name text PRIMARY KEY,
+                last_key text NOT NULL,
+                rows_done bigint NOT NULL,
+                updated_at timestamptz NOT NULL DEFAULT now()
+            )
+        """))
+        checkpoint = bind.execute(
+            sa.text(f"SELECT last_key, rows_done FROM {CHECKPOINTS_TABLE} WHERE name = :name"),
+            {"name": name},
+        ).first()
+        last_key, done = checkpoint if checkpoint else (None, 0)
+        if checkpoint:
+            logger.info("Resuming backfill %s after %s rows", name, done)
+
+        total = _estimated_rows(table)
+        started, updated = time.monotonic(), 0
+        while True:
+            row = bind.execute(
+                statement, {"name": name, "last_key": last_key, "batch_size": batch_size}
+            ).first()
+            if row is None:
+                break
+
+            updated += row.rows_done - done
+            last_key, done = row.last_key, row.rows_done
+            rate = updated / max(time.monotonic() - started, 1e-9)
+            progress = f" (~{min(100, done * 100 // total)}% of {total})" if total else ""
+            logger.info("Backfill %s: %s rows%s, %.0f rows/s", name, done, progress, rate)
+            if pause:
+                time.sleep(pause)
+
+        bind.execute(sa.text(f"DELETE FROM {CHECKPOINTS_TABLE} WHERE name = :name"), {"name": name})
+        logger.info("Backfill %s finished: %s rows", name, done)
+    return updated
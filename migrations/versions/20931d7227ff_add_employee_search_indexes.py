@@ -0,0 +1,39 @@
+"""Add employee search indexes
+
+Revision ID: 20931d7227ff
+Revises: 15443c1c7d8c
+Create Date: 2026-10-18 09:12:41.538201
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20931d7227ff'
+down_revision: Union[str, None] = '15443c1c7d8c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    create_index_concurrently('ix_contractual_employees_email_trgm', 'contractual_employees', ['email'], postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'})
+    create_index_concurrently('ix_contractual_employees_first_name_trgm', 'contractual_employees', ['first_name'], postgresql_using='gin', postgresql_ops={'first_name': 'gin_trgm_ops'})
+    create_index_concurrently('ix_contractual_employees_last_name_trgm', 'contractual_employees', ['last_name'], postgresql_using='gin', postgresql_ops={'last_name': 'gin_trgm_ops'})
+    create_index_concurrently('ix_regular_employees_email_trgm', 'regular_employees', ['email'], postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'})
+    create_index_concurrently('ix_regular_employees_first_name_trgm', 'regular_employees', ['first_name'], postgresql_using='gin', postgresql_ops={'first_name': 'gin_trgm_ops'})
+    create_index_concurrently('ix_regular_employees_last_name_trgm', 'regular_employees', ['last_name'], postgresql_using='gin', postgresql_ops={'last_name': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    drop_index_concurrently('ix_regular_employees_last_name_trgm', 'regular_employees')
+    drop_index_concurrently('ix_regular_employees_first_name_trgm', 'regular_employees')
+    drop_index_concurrently('ix_regular_employees_email_trgm', 'regular_employees')
+    drop_index_concurrently('ix_contractual_employees_last_name_trgm', 'contractual_employees')
+    drop_index_concurrently('ix_contractual_employees_first_name_trgm', 'contractual_employees')
+    drop_index_concurrently('ix_contractual_employees_email_trgm', 'contractual_employees')
@@ -0,0 +1,29 @@
+"""Add employee version columns
+
+Revision ID: 7c1e5f04b9a2
+Revises: 20931d7227ff
+Create Date: 2026-10-18 11:04:27.913562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e5f04b9a2'
+down_revision: Union[str, None] = '20931d7227ff'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A constant server default lets PostgreSQL add the column without rewriting the table
+    op.add_column('contractual_employees', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('regular_employees', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('regular_employees', 'version')
+    op.drop_column('contractual_employees', 'version')
@@ -0,0 +1,29 @@
+"""Add contract end date index
+
+Revision ID: b3d9a6e1f250
+Revises: 7c1e5f04b9a2
+Create Date: 2026-10-18 14:22:09.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d9a6e1f250'
+down_revision: Union[str, None] = '7c1e5f04b9a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The ID breaks ties between equal dates, matching the keyset order of the expiring endpoint
+    create_index_concurrently('ix_contractual_employees_contract_end_date_id', 'contractual_employees', ['contract_end_date', 'id'])
+
+
+def downgrade() -> None:
+    drop_index_concurrently('ix_contractual_employees_contract_end_date_id', 'contractual_employees')